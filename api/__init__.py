@@ -2,13 +2,15 @@ import datetime
 import os
 
 from flasgger import Swagger
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 
 from .config import Config
 from .database import AnalysisResult, db_session, init_db
-from .errors import bad_request, internal_error
-from .tasks import celery_app, run_full_analysis, run_hybrid_analysis_task, run_backtesting_task
-from .utils import validate_ticker
+from .errors import bad_request, internal_error, not_found
+from .metrics import metrics_payload, record_cache
+from .profiling import list_profiles, summarize_profile
+from .tasks import cancel_task, celery_app, run_backtesting_task, run_full_analysis, run_hybrid_analysis_task
+from .utils import analysis_payload, hybrid_payload, status_payload, task_options, validate_ticker
 
 # Create and configure the Flask application
 app = Flask(__name__, static_folder="../frontend/build")
@@ -54,6 +56,11 @@ def analyze():
         required: false
         description: The type of analysis to perform (simple or hybrid).
         default: simple
+      - name: profile
+        in: formData
+        type: boolean
+        required: false
+        description: Profile the analysis task and save the results under PROFILE_DIR.
     responses:
       200:
         description: The task ID of the analysis task.
@@ -75,15 +82,19 @@ def analyze():
     ).first()
 
     if cached_result and cached_result.arima_plot and analysis_type == "simple":
+        record_cache("analysis_result", hit=True)
         return jsonify({"task_id": None})
 
     if cached_result and cached_result.hybrid_plot and analysis_type == "hybrid":
+        record_cache("analysis_result", hit=True)
         return jsonify({"task_id": None})
 
+    record_cache("analysis_result", hit=False)
+
     if analysis_type == "simple":
-        task = run_full_analysis.delay(ticker)
+        task = run_full_analysis.apply_async(args=[ticker], **task_options())
     elif analysis_type == "hybrid":
-        task = run_hybrid_analysis_task.delay(ticker)
+        task = run_hybrid_analysis_task.apply_async(args=[ticker], **task_options())
     else:
         return bad_request("Invalid analysis type.")
 
@@ -118,18 +129,33 @@ def task_status(task_id):
               description: The result of the task (if completed).
     """
     task = celery_app.AsyncResult(task_id)
-    if task.state == "PENDING":
-        response = {"state": task.state, "status": "Pending..."}
-    elif task.state != "FAILURE":
-        response = {"state": task.state, "status": task.info.get("status", "")}
-        if "result" in task.info:
-            response["result"] = task.info["result"]
-    else:
-        response = {
-            "state": task.state,
-            "status": str(task.info),
-        }
-    return jsonify(response)
+    return jsonify(status_payload(task.state, task.info))
+
+
+@app.route("/cancel/<task_id>", methods=["POST"])
+def cancel(task_id):
+    """
+    Cancels a background task, e.g. when the user leaves the page.
+    A queued task is discarded; a running analysis stops at its next stage and is reported as REVOKED.
+    ---
+    parameters:
+      - name: task_id
+        in: path
+        type: string
+        required: true
+        description: The ID of the background task.
+    responses:
+      200:
+        description: The task was cancelled.
+        schema:
+          type: object
+          properties:
+            task_id:
+              type: string
+              description: The ID of the cancelled task.
+    """
+    cancel_task(task_id)
+    return jsonify({"task_id": task_id})
 
 
 @app.route("/data/<ticker>")
@@ -169,12 +195,9 @@ def get_data(ticker):
                     type: string
     """
     result = AnalysisResult.query.filter(AnalysisResult.ticker == ticker).first()
-    if result and result.arima_plot:
-        return jsonify(
-            {"arima_plot": result.arima_plot, "sentiment": result.sentiment, "posts": result.sentiment_posts}
-        )
-    else:
-        return jsonify({"arima_plot": None, "sentiment": None, "posts": None})
+    if result is None:
+        return jsonify(analysis_payload(None, None, None))
+    return jsonify(analysis_payload(result.arima_plot, result.sentiment, result.sentiment_posts))
 
 
 @app.route("/api/backtest", methods=["POST"])
@@ -189,6 +212,11 @@ def backtest():
         type: string
         required: true
         description: The stock ticker symbol.
+      - name: profile
+        in: formData
+        type: boolean
+        required: false
+        description: Profile the task and save the results under PROFILE_DIR.
     responses:
       200:
         description: The task ID of the backtesting task.
@@ -203,7 +231,7 @@ def backtest():
     """
     ticker = request.form.get("ticker").upper()
 
-    task = run_backtesting_task.delay(ticker)
+    task = run_backtesting_task.apply_async(args=[ticker], **task_options())
     return jsonify({"task_id": task.id})
 
 
@@ -219,6 +247,11 @@ def hybrid_analyze():
         type: string
         required: true
         description: The stock ticker symbol.
+      - name: profile
+        in: formData
+        type: boolean
+        required: false
+        description: Profile the task and save the results under PROFILE_DIR.
     responses:
       200:
         description: The task ID of the analysis task.
@@ -233,7 +266,7 @@ def hybrid_analyze():
     """
     ticker = request.form.get("ticker").upper()
 
-    task = run_hybrid_analysis_task.delay(ticker)
+    task = run_hybrid_analysis_task.apply_async(args=[ticker], **task_options())
     return jsonify({"task_id": task.id})
 
 
@@ -259,10 +292,72 @@ def hybrid_data(ticker):
               description: The hybrid plot as a JSON string.
     """
     result = AnalysisResult.query.filter(AnalysisResult.ticker == ticker).first()
-    if result and result.hybrid_plot:
-        return jsonify({"hybrid_plot": result.hybrid_plot})
-    else:
-        return jsonify({"hybrid_plot": None})
+    return jsonify(hybrid_payload(result.hybrid_plot if result else None))
+
+
+@app.route("/metrics")
+def metrics():
+    """
+    Exposes pipeline stage timings, cache hit rates, queue wait times and task outcomes in Prometheus format.
+    ---
+    responses:
+      200:
+        description: The metrics in the Prometheus text exposition format.
+    """
+    body, content_type = metrics_payload()
+    return Response(body, content_type=content_type)
+
+
+@app.route("/profiles")
+def profiles():
+    """
+    Lists the saved task profiles, most recent first.
+    ---
+    responses:
+      200:
+        description: The metadata of each saved profile.
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              task_id:
+                type: string
+              task:
+                type: string
+              duration:
+                type: number
+    """
+    return jsonify(list_profiles())
+
+
+@app.route("/profiles/<task_id>")
+def profile_summary(task_id):
+    """
+    Summarizes the saved profile of a task.
+    ---
+    parameters:
+      - name: task_id
+        in: path
+        type: string
+        required: true
+        description: The ID of the profiled task.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 20
+        description: The number of functions and allocation sites to return.
+    responses:
+      200:
+        description: The top functions by cumulative time and the top allocation sites.
+      404:
+        description: No profile exists for the task.
+    """
+    try:
+        return jsonify(summarize_profile(task_id, limit=request.args.get("limit", 20, type=int)))
+    except (FileNotFoundError, ValueError):
+        return not_found(f"No profile found for task {task_id}.")
 
 
 @app.errorhandler(400)
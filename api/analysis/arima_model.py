@@ -1,17 +1,27 @@
 import itertools
 import logging
+import time
 
+import numpy as np
 import pandas as pd
 from statsmodels.tsa.arima.model import ARIMA
 
-from ..exceptions import AnalysisError
+from ..budgets import mark_degraded
+from ..exceptions import AnalysisError, StageTimeoutError
+from ..metrics import stage_timer, timed
+from . import simulation
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def find_best_arima_order(data):
+# Days of sentiment averaged to extend the regressor over the forecast horizon.
+FORECAST_SENTIMENT_DAYS = 5
+
+@timed("arima_search")
+def find_best_arima_order(data, exog=None, deadline=None):
     """
     Iterates through combinations of p, d, and q to find the best ARIMA model order based on AIC (Akaike Information Criterion).
-    A lower AIC indicates a better model fit.
+    A lower AIC indicates a better model fit. With `exog`, the orders are compared as ARIMAX models.
+    With a `deadline` (a `time.monotonic()` value), no more orders are tried once it has passed.
     """
     p = d = q = range(0, 3)
     pdq = list(itertools.product(p, d, q))
@@ -19,36 +29,101 @@ def find_best_arima_order(data):
     best_aic = float("inf")
     best_order = None
 
-    for order in pdq:
+    for tried, order in enumerate(pdq):
+        if deadline is not None and time.monotonic() >= deadline:
+            logging.warning(f"The ARIMA order search ran out of time after {tried} of {len(pdq)} orders.")
+            mark_degraded("arima")
+            break
         try:
-            model = ARIMA(data, order=order)
+            model = ARIMA(data, exog=exog, order=order)
             model_fit = model.fit()
             if model_fit.aic < best_aic:
                 best_aic = model_fit.aic
                 best_order = order
+        except StageTimeoutError:
+            raise
         except Exception:
             continue
 
     return best_order
 
-def forecast_stock_price(df, steps=30):
+def fit_arima_model(data, exog=None, deadline=None):
     """
-    Forecasts the stock price using the best ARIMA model found.
+    Fits an ARIMA model to the series using the best order found, falling back to (5,1,0).
+    `exog` is an optional exogenous regressor with one value per observation (ARIMAX), and `deadline`
+    ends the order search early (see `find_best_arima_order`).
+    Returns the fitted results and the order used.
     """
-    try:
-        best_order = find_best_arima_order(df['Close'])
-        if best_order is None:
-            logging.warning("Could not find a suitable ARIMA model. Falling back to default order (5,1,0).")
-            best_order = (5, 1, 0)
+    best_order = find_best_arima_order(data, exog, deadline)
+    if best_order is None:
+        logging.warning("Could not find a suitable ARIMA model. Falling back to default order (5,1,0).")
+        best_order = (5, 1, 0)
 
-        model = ARIMA(df['Close'], order=best_order)
+    model = ARIMA(data, exog=exog, order=best_order)
+    with stage_timer("arima_fit"):
         model_fit = model.fit()
+    return model_fit, best_order
+
+def sentiment_regressor(sentiment, index, steps):
+    """
+    Aligns a daily sentiment Series to a price index for use as an exogenous regressor. Days without posts
+    count as neutral (0). Returns the values for `index` and the values assumed for the next `steps` days:
+    the mean of the last FORECAST_SENTIMENT_DAYS days.
+    """
+    days = pd.DatetimeIndex(index)
+    if days.tz is not None:
+        days = days.tz_localize(None)
+    in_sample = sentiment.reindex(days.normalize()).fillna(0.0).to_numpy()
+    future = np.full(steps, in_sample[-FORECAST_SENTIMENT_DAYS:].mean())
+    return in_sample, future
 
+def _fit_and_forecast(df, steps, sentiment, deadline):
+    """Fits the (S)ARIMA(X) model of `forecast_stock_price`. Returns the fitted results, order, forecast and dates."""
+    exog, future_exog = sentiment_regressor(sentiment, df.index, steps) if sentiment is not None else (None, None)
+    if exog is not None and np.any(exog):
+        model_fit, order = fit_arima_model(df['Close'], exog=exog, deadline=deadline)
+        forecast = model_fit.forecast(steps=steps, exog=future_exog)
+    else:
+        model_fit, order = fit_arima_model(df['Close'], deadline=deadline)
         forecast = model_fit.forecast(steps=steps)
 
-        forecast_dates = pd.to_datetime(df.index[-1]) + pd.to_timedelta(range(1, steps + 1), unit='D')
+    forecast_dates = pd.to_datetime(df.index[-1]) + pd.to_timedelta(range(1, steps + 1), unit='D')
+    return model_fit, order, forecast, forecast_dates
 
+def forecast_stock_price(df, steps=30, sentiment=None, deadline=None):
+    """
+    Forecasts the stock price using the best ARIMA model found.
+    If a daily `sentiment` Series is given and overlaps the prices, it is used as an exogenous regressor (ARIMAX).
+    Past the optional `deadline`, the order search keeps the best order found so far.
+    """
+    try:
+        _, _, forecast, forecast_dates = _fit_and_forecast(df, steps, sentiment, deadline)
         return forecast, forecast_dates
+    except StageTimeoutError:
+        raise
+    except Exception as e:
+        logging.error(f"Error during ARIMA forecasting: {e}")
+        raise AnalysisError("Failed to generate stock price forecast.") from e
+
+def forecast_stock_price_with_bands(
+    df, steps=30, sentiment=None, deadline=None, n_paths=5000, seed=42, percentiles=simulation.DEFAULT_PERCENTILES
+):
+    """
+    Forecasts the stock price like `forecast_stock_price` and adds Monte Carlo percentile bands,
+    simulated from the fitted residual variance and the model's MA(infinity) weights.
+    Returns `(forecast, forecast_dates, bands)`.
+    """
+    try:
+        model_fit, order, forecast, forecast_dates = _fit_and_forecast(df, steps, sentiment, deadline)
+
+        psi = simulation.arima_psi_weights(model_fit.polynomial_ar, model_fit.polynomial_ma, order[1], steps)
+        paths = simulation.simulate_residual_paths(
+            np.asarray(forecast, dtype=float), model_fit.params["sigma2"], psi=psi, n_paths=n_paths, seed=seed
+        )
+
+        return forecast, forecast_dates, simulation.percentile_bands(paths, percentiles)
+    except StageTimeoutError:
+        raise
     except Exception as e:
         logging.error(f"Error during ARIMA forecasting: {e}")
         raise AnalysisError("Failed to generate stock price forecast.") from e
@@ -0,0 +1,249 @@
+"""
+Parallel, resumable backtesting across many tickers and models.
+
+The work is split into independent (ticker, model, fold) units using rolling-origin evaluation: each fold
+fits the model on all data before its origin and forecasts the following `horizon` days. Units run in a
+process pool and every completed unit is appended to a JSON-lines checkpoint, so an interrupted run picks up
+where it stopped. Checkpointed units are keyed by the fold settings and the price window as well, so a run
+resumed with a different horizon, number of folds or data window recomputes them instead of reusing stale
+results. Results are aggregated into a MAE/RMSE comparison table.
+
+Usage:
+    python -m api.analysis.backtest_runner AAPL MSFT --models arima holt --folds 5 --horizon 5 --workers 8
+"""
+
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from ..config import Config
+from ..data.stock_data import get_price_history
+from ..exceptions import AnalysisError
+from . import baseline_model
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+MODELS = ("arima", "lstm", *baseline_model.METHODS)
+CHECKPOINT_FILE = "results.jsonl"
+
+
+def rolling_origin_folds(n_obs, n_folds=5, horizon=5, min_train=60):
+    """
+    Returns the forecast origins of `n_folds` consecutive, non-overlapping test windows at the end of a
+    series of `n_obs` observations. Fold k trains on `[0, origin_k)` and tests on `[origin_k, origin_k + horizon)`.
+    """
+    origins = [n_obs - horizon * (n_folds - k) for k in range(n_folds)]
+    if origins[0] < min_train:
+        raise AnalysisError(
+            f"Not enough data for {n_folds} folds of {horizon} days with at least {min_train} training days."
+        )
+    return origins
+
+
+def _forecast(model, history, horizon):
+    """Forecasts `horizon` days after the `history` DataFrame with the named model."""
+    if model == "arima":
+        from . import arima_model
+
+        forecast, _ = arima_model.forecast_stock_price(history, steps=horizon)
+        return np.asarray(forecast, dtype=float)
+    if model == "lstm":
+        # TensorFlow is imported lazily so that only the pool processes that run LSTM units load it.
+        from . import lstm_model
+
+        return np.asarray(lstm_model.forecast_with_lstm(history, steps=horizon), dtype=float)
+    return baseline_model.forecast_baseline(history["Close"].to_numpy(), steps=horizon, method=model)[0]
+
+
+def _date(value):
+    return str(pd.Timestamp(value).date())
+
+
+def evaluate_unit(ticker, model, fold, origin, horizon, closes, dates, n_folds):
+    """
+    Runs one work unit: fits `model` on the prices before `origin` and scores its forecast against the
+    next `horizon` prices. Returns a JSON-serialisable record.
+    """
+    history = pd.DataFrame({"Close": closes[:origin]}, index=pd.DatetimeIndex(dates[:origin]))
+    actual = np.asarray(closes[origin : origin + horizon], dtype=float)
+
+    errors = _forecast(model, history, horizon) - actual
+    return {
+        "ticker": ticker,
+        "model": model,
+        "fold": fold,
+        "n_folds": n_folds,
+        "horizon": horizon,
+        "start_date": _date(dates[0]),
+        "end_date": _date(dates[-1]),
+        "origin_date": _date(dates[origin]),
+        "n": len(errors),
+        "mae": float(np.mean(np.abs(errors))),
+        "rmse": float(np.sqrt(np.mean(errors**2))),
+        "errors": errors.tolist(),
+    }
+
+
+def unit_key(record):
+    """Identifies a unit by its ticker, model and fold, and by the fold settings and price window it was run with."""
+    return tuple(
+        record.get(field) for field in ("ticker", "model", "fold", "n_folds", "horizon", "start_date", "end_date")
+    )
+
+
+def load_checkpoint(run_dir):
+    """
+    Reads the completed unit records of a run. A truncated last line (from a run killed mid-write) is ignored.
+    """
+    path = os.path.join(run_dir, CHECKPOINT_FILE)
+    records = []
+    if not os.path.exists(path):
+        return records
+
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logging.warning(f"Ignoring a corrupt checkpoint line in {path}.")
+    return records
+
+
+def _open_checkpoint(run_dir):
+    """Opens the checkpoint for appending, terminating a truncated last line so new records start cleanly."""
+    path = os.path.join(run_dir, CHECKPOINT_FILE)
+    f = open(path, "a+")
+    if f.tell() > 0:
+        f.seek(f.tell() - 1)
+        if f.read(1) != "\n":
+            f.write("\n")
+    return f
+
+
+def _append_checkpoint(f, record):
+    f.write(json.dumps(record) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def fetch_prices(tickers, period="5y"):
+    """Fetches the closing price series of each ticker from the configured data provider."""
+    prices = {}
+    for ticker_symbol in tickers:
+        prices[ticker_symbol] = get_price_history(ticker_symbol, period=period).frame()["Close"]
+    return prices
+
+
+def run_backtest_suite(prices, models=("arima", "lstm"), n_folds=5, horizon=5, run_dir=None, max_workers=None):
+    """
+    Backtests every model on every ticker over rolling-origin folds.
+
+    `prices` maps each ticker to its closing price Series. Units already recorded in the checkpoint under
+    `run_dir` with the same fold settings and price window are skipped; records of other settings are ignored.
+    Each unit is independent, so throughput scales with `max_workers` (defaults to the number of CPUs).
+    Returns the list of all unit records of this run, including resumed ones.
+    """
+    unknown = set(models) - set(MODELS)
+    if unknown:
+        raise AnalysisError(f"Unknown backtest models {sorted(unknown)}. Choose from {list(MODELS)}.")
+
+    run_dir = run_dir or Config.BACKTEST_RUN_DIR
+    os.makedirs(run_dir, exist_ok=True)
+    checkpointed = load_checkpoint(run_dir)
+
+    units = {}
+    for ticker_symbol, series in prices.items():
+        closes = series.to_numpy(dtype=float)
+        dates = series.index.to_numpy()
+        window = (n_folds, horizon, _date(dates[0]), _date(dates[-1]))
+        for fold, origin in enumerate(rolling_origin_folds(len(closes), n_folds, horizon)):
+            for model in models:
+                units[(ticker_symbol, model, fold, *window)] = (
+                    ticker_symbol,
+                    model,
+                    fold,
+                    origin,
+                    horizon,
+                    closes,
+                    dates,
+                    n_folds,
+                )
+
+    records = [record for record in checkpointed if unit_key(record) in units]
+    done = {unit_key(record) for record in records}
+    jobs = [job for key, job in units.items() if key not in done]
+
+    stale = len(checkpointed) - len(records)
+    logging.info(
+        f"Backtest run in '{run_dir}': {len(done)} units resumed, {len(jobs)} units to run"
+        + (f", {stale} checkpointed units with other settings ignored." if stale else ".")
+    )
+    if not jobs:
+        return records
+
+    with _open_checkpoint(run_dir) as checkpoint, ProcessPoolExecutor(max_workers) as pool:
+        futures = {pool.submit(evaluate_unit, *job): job for job in jobs}
+        for future in as_completed(futures):
+            ticker_symbol, model, fold = futures[future][:3]
+            try:
+                record = future.result()
+            except Exception as e:
+                # A failed unit is not checkpointed, so it is retried when the run is resumed.
+                logging.error(f"Backtest unit ({ticker_symbol}, {model}, fold {fold}) failed: {e}")
+                continue
+            _append_checkpoint(checkpoint, record)
+            records.append(record)
+
+    return records
+
+
+def aggregate_results(records, by=("ticker", "model")):
+    """
+    Aggregates unit records into a MAE/RMSE comparison table grouped by `by`.
+    MAE is averaged over all forecast days and RMSE is pooled from the per-unit squared errors.
+    """
+    if not records:
+        return pd.DataFrame(columns=["mae", "rmse", "units"])
+
+    df = pd.DataFrame(records)
+    df["abs_sum"] = df["mae"] * df["n"]
+    df["sq_sum"] = df["rmse"] ** 2 * df["n"]
+    grouped = df.groupby(list(by)).agg(
+        abs_sum=("abs_sum", "sum"), sq_sum=("sq_sum", "sum"), n=("n", "sum"), units=("fold", "count")
+    )
+
+    return pd.DataFrame(
+        {
+            "mae": grouped["abs_sum"] / grouped["n"],
+            "rmse": np.sqrt(grouped["sq_sum"] / grouped["n"]),
+            "units": grouped["units"],
+        }
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a parallel, resumable multi-ticker backtest.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--models", nargs="+", default=["arima", "lstm"], choices=MODELS)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--run-dir", default=Config.BACKTEST_RUN_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    prices = fetch_prices([ticker.upper() for ticker in args.tickers], period=args.period)
+    records = run_backtest_suite(prices, args.models, args.folds, args.horizon, args.run_dir, args.workers)
+
+    print(aggregate_results(records).to_string())
+    print()
+    print(aggregate_results(records, by=("model",)).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,178 @@
+import datetime
 import logging
-import pandas as pd
+
 import numpy as np
-import yfinance as yf
 from sklearn.metrics import mean_absolute_error, mean_squared_error
+from sqlalchemy.exc import IntegrityError
 
-from . import arima_model, lstm_model
+from ..budgets import stage_budget
+from ..config import Config
+from ..data.stock_data import get_price_history
+from ..database import BacktestPrediction, db_session
 from ..exceptions import StockDataError
+from . import arima_model, global_lstm, lstm_model
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def run_backtesting(ticker_symbol, period="1y"):
+BACKTEST_MODELS = ("arima", "lstm")
+TRAIN_FRACTION = 0.8
+
+def load_global_lstm():
+    """
+    Returns the global LSTM and its metadata as `(model, meta)` if LSTM forecasts come from it, or
+    `(None, None)` if they are trained per ticker (including when no usable global model exists).
+    The backtest forecasts with the returned model, so its predictions are keyed by the model actually used.
+    """
+    if Config.LSTM_MODE != "global":
+        return None, None
+    try:
+        return global_lstm.get_global_model()
+    except FileNotFoundError as e:
+        logging.warning(f"No usable global LSTM ({e}). Backtesting a per-ticker LSTM instead.")
+        return None, None
+
+def backtest_config(period, model, global_meta=None):
+    """
+    Returns the key under which the model's predictions made with these backtest settings are stored.
+    Global LSTM predictions are keyed by the training run, so a retrained model is evaluated afresh.
+    """
+    if model == "lstm" and global_meta is not None:
+        return f"period={period};lstm=global@{global_meta['trained_at']}"
+    return f"period={period}"
+
+def _predict_next_day(model, history, global_model=None):
+    """
+    Forecasts the day after the `history` DataFrame with the named model. The LSTM forecast comes from
+    `global_model` if one is given, and from a model trained on `history` otherwise.
+    """
+    if model == "arima":
+        forecast, _ = arima_model.forecast_stock_price(history, steps=1)
+        return float(forecast.iloc[0])
+    if global_model is not None:
+        return float(global_lstm.forecast_many([history['Close'].to_numpy()], steps=1, model=global_model)[0, 0])
+    return float(lstm_model.forecast_with_ticker_lstm(history, steps=1)[0])
+
+def last_stored_date(session, ticker_symbol, model, config):
+    """Returns the date of the latest stored prediction, or None if none is stored."""
+    return session.query(BacktestPrediction.date).filter_by(
+        ticker=ticker_symbol, model=model, config=config
+    ).order_by(BacktestPrediction.date.desc()).limit(1).scalar()
+
+def store_predictions(session, rows):
+    """
+    Saves new prediction rows. If a concurrent backtest of the same ticker already stored them, its rows
+    are kept and these are discarded.
+    """
+    try:
+        session.add_all(rows)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        logging.info("Predictions were stored by a concurrent backtest; keeping the stored rows.")
+
+def load_predictions(session, ticker_symbol, model, config, start_date):
+    """Returns the stored `(date, prediction, actual)` rows from `start_date` onwards, in date order."""
+    return session.query(
+        BacktestPrediction.date, BacktestPrediction.prediction, BacktestPrediction.actual
+    ).filter(
+        BacktestPrediction.ticker == ticker_symbol,
+        BacktestPrediction.model == model,
+        BacktestPrediction.config == config,
+        BacktestPrediction.date >= start_date,
+    ).order_by(BacktestPrediction.date).all()
+
+def run_backtesting(ticker_symbol, period="1y", session=None, on_step=None):
     """
     Performs backtesting of the forecasting models.
+
+    Each day of the test period is forecast one step ahead from all the days before it. Predictions are
+    stored per day, so only the days after the last stored prediction are evaluated, and MAE/RMSE are
+    computed from the stored rows. The global LSTM is only scored on the test days after its last trained
+    date; if there are none, its scores are None and the result says why.
+
+    Each model's predictions run as the `backtest_<model>` stage of STAGE_BUDGETS. `on_step` is called with a
+    status message before each model and each step; an exception it raises (such as `TaskCancelledError`) stops
+    the backtest, after the predictions made so far have been stored.
     """
+    session = session or db_session
+    ticker_symbol = ticker_symbol.upper()
     try:
         # 1. Get historical data
-        ticker = yf.Ticker(ticker_symbol)
-        hist = ticker.history(period=period)
-        if hist.empty:
-            raise StockDataError(f"No historical data found for ticker '{ticker_symbol}' for the given period.")
+        hist = get_price_history(ticker_symbol, period=period).frame()
 
         # 2. Split data
-        train_size = int(len(hist) * 0.8)
-        train_data, test_data = hist[0:train_size], hist[train_size:]
-
-        logging.info(f"Backtesting with {len(train_data)} training samples and {len(test_data)} testing samples.")
-
-        # 3. Backtest ARIMA model
-        arima_predictions = []
-        history_arima = train_data.copy()
-        for t in range(len(test_data)):
-            logging.info(f"Backtesting ARIMA model: step {t+1}/{len(test_data)}")
-            forecast, _ = arima_model.forecast_stock_price(history_arima, steps=1)
-            arima_predictions.append(forecast.iloc[0])
-            history_arima = pd.concat([history_arima, test_data.iloc[t:t+1]])
-
-        arima_mae = mean_absolute_error(test_data['Close'], arima_predictions)
-        arima_rmse = np.sqrt(mean_squared_error(test_data['Close'], arima_predictions))
-
-        logging.info(f"ARIMA Backtesting Results: MAE={arima_mae:.4f}, RMSE={arima_rmse:.4f}")
-
-        # 4. Backtest LSTM model
-        lstm_predictions = []
-        history_lstm = train_data.copy()
-        for t in range(len(test_data)):
-            logging.info(f"Backtesting LSTM model: step {t+1}/{len(test_data)}")
-            forecast = lstm_model.forecast_with_lstm(history_lstm, steps=1)
-            lstm_predictions.append(forecast[0])
-            history_lstm = pd.concat([history_lstm, test_data.iloc[t:t+1]])
-
-        lstm_mae = mean_absolute_error(test_data['Close'], lstm_predictions)
-        lstm_rmse = np.sqrt(mean_squared_error(test_data['Close'], lstm_predictions))
-
-        logging.info(f"LSTM Backtesting Results: MAE={lstm_mae:.4f}, RMSE={lstm_rmse:.4f}")
-
-        return {
-            "status": "success",
-            "arima_mae": arima_mae,
-            "arima_rmse": arima_rmse,
-            "lstm_mae": lstm_mae,
-            "lstm_rmse": lstm_rmse
-        }
+        train_size = int(len(hist) * TRAIN_FRACTION)
+        dates = [timestamp.date() for timestamp in hist.index]
+        test_start = dates[train_size]
+
+        global_model, global_meta = load_global_lstm()
+        results = {"status": "success", "evaluated_days": {}}
+        for model in BACKTEST_MODELS:
+            config = backtest_config(period, model, global_meta)
+            first_date = test_start
+            if model == "lstm" and global_meta is not None:
+                # Days the global model was trained on would leak into its scores.
+                train_end = global_meta.get("train_end")
+                if train_end is None:
+                    first_date = datetime.date.max
+                else:
+                    first_date = max(test_start, datetime.date.fromisoformat(train_end) + datetime.timedelta(days=1))
+
+            # 3. Predict the test days after the last stored prediction
+            last_date = last_stored_date(session, ticker_symbol, model, config)
+            positions = [
+                t for t in range(train_size, len(hist))
+                if dates[t] >= first_date and (last_date is None or dates[t] > last_date)
+            ]
+            status = f"Backtesting {model.upper()} model: {len(positions)} new of {len(hist) - train_size} test days."
+            logging.info(status)
+            if on_step is not None:
+                on_step(status)
+
+            rows = []
+            try:
+                with stage_budget(f"backtest_{model}"):
+                    for step, t in enumerate(positions):
+                        status = f"Backtesting {model.upper()} model: step {step+1}/{len(positions)}"
+                        logging.info(status)
+                        if on_step is not None:
+                            on_step(status)
+                        prediction = _predict_next_day(model, hist.iloc[:t], global_model=global_model)
+                        actual = float(hist['Close'].iloc[t])
+                        rows.append(BacktestPrediction(
+                            ticker=ticker_symbol, model=model, config=config, date=dates[t],
+                            prediction=prediction, actual=actual, error=prediction - actual,
+                        ))
+            finally:
+                # Stored predictions are not evaluated again, so a stopped backtest resumes where it stopped.
+                if rows:
+                    store_predictions(session, rows)
+
+            # 4. Score the test period from the stored predictions
+            stored = load_predictions(session, ticker_symbol, model, config, first_date)
+            results["evaluated_days"][model] = len(rows)
+            if not stored:
+                results[f"{model}_mae"] = results[f"{model}_rmse"] = None
+                if model == "lstm" and global_meta is not None:
+                    logging.warning(f"No {model.upper()} test days after the global model's training data.")
+                    results[f"{model}_note"] = (
+                        "The global LSTM was trained on the whole test period; "
+                        "set GLOBAL_LSTM_HOLDOUT_DAYS to hold test days out of its training."
+                    )
+                else:
+                    logging.warning(f"No {model.upper()} test days were evaluated.")
+                    results[f"{model}_note"] = "No test days were evaluated; the price history may be too short."
+                continue
+            predictions = [row.prediction for row in stored]
+            actuals = [row.actual for row in stored]
+            mae = mean_absolute_error(actuals, predictions)
+            rmse = np.sqrt(mean_squared_error(actuals, predictions))
+            results[f"{model}_mae"] = mae
+            results[f"{model}_rmse"] = rmse
+
+            logging.info(f"{model.upper()} Backtesting Results: MAE={mae:.4f}, RMSE={rmse:.4f}")
+
+        return results
 
     except StockDataError as e:
         logging.error(f"Stock data error during backtesting: {e}")
@@ -0,0 +1,141 @@
+"""
+Fast baseline forecasters that fit a whole universe of tickers at once.
+
+Every function takes a `(tickers, days)` price matrix and returns a `(tickers, steps)` forecast matrix,
+computed with NumPy operations across all tickers instead of one statsmodels fit per ticker.
+These are intended for large-universe screening; ARIMA and LSTM remain the models used for single tickers.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..exceptions import AnalysisError
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def _as_price_matrix(prices, min_days):
+    """Converts the input to a 2-D float array and checks that it is complete and long enough."""
+    prices = np.asarray(prices, dtype=float)
+    if prices.ndim == 1:
+        prices = prices.reshape(1, -1)
+    if prices.ndim != 2 or prices.shape[1] < min_days:
+        raise AnalysisError(
+            f"Expected a (tickers, days) price matrix with at least {min_days} days, got {prices.shape}."
+        )
+    if not np.isfinite(prices).all():
+        raise AnalysisError("The price matrix contains missing or non-finite values.")
+    return prices
+
+
+def forecast_drift(prices, steps=30):
+    """
+    Random walk with drift: extends the line from the first to the last observed price.
+    """
+    prices = _as_price_matrix(prices, min_days=2)
+    drift = (prices[:, -1] - prices[:, 0]) / (prices.shape[1] - 1)
+    horizon = np.arange(1, steps + 1)
+    return prices[:, -1:] + drift[:, None] * horizon
+
+
+def forecast_holt(prices, steps=30, alpha=0.3, beta=0.1):
+    """
+    Holt's linear exponential smoothing with fixed smoothing parameters.
+    The recursion runs over days, with each update applied to all tickers at once.
+    """
+    prices = _as_price_matrix(prices, min_days=2)
+    level = prices[:, 0].copy()
+    trend = prices[:, 1] - prices[:, 0]
+
+    for t in range(1, prices.shape[1]):
+        previous_level = level
+        level = alpha * prices[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+
+    horizon = np.arange(1, steps + 1)
+    return level[:, None] + trend[:, None] * horizon
+
+
+def forecast_ar(prices, steps=30, p=5, ridge=1e-8):
+    """
+    AR(p) with an intercept on daily price changes, fitted by least squares for all tickers at once.
+    The normal equations of every ticker are solved in one batched call, then the forecast changes are
+    accumulated onto the last observed price.
+    """
+    prices = _as_price_matrix(prices, min_days=p + 3)
+    diffs = np.diff(prices, axis=1)
+
+    # Row j of the design matrix holds the p changes preceding diffs[:, p + j], most recent first.
+    lags = sliding_window_view(diffs, p, axis=1)[:, :-1, ::-1]
+    design = np.concatenate([np.ones(lags.shape[:2] + (1,)), lags], axis=2)
+    target = diffs[:, p:]
+
+    gram = np.einsum("tnk,tnj->tkj", design, design) + ridge * np.eye(p + 1)
+    moment = np.einsum("tnk,tn->tk", design, target)
+    coefficients = np.linalg.solve(gram, moment[..., None])[..., 0]
+
+    recent = diffs[:, -p:][:, ::-1].copy()
+    predicted_diffs = np.empty((prices.shape[0], steps))
+    for h in range(steps):
+        next_diff = coefficients[:, 0] + np.einsum("tk,tk->t", coefficients[:, 1:], recent)
+        predicted_diffs[:, h] = next_diff
+        recent = np.concatenate([next_diff[:, None], recent[:, :-1]], axis=1)
+
+    return prices[:, -1:] + np.cumsum(predicted_diffs, axis=1)
+
+
+METHODS = {
+    "drift": forecast_drift,
+    "holt": forecast_holt,
+    "ar": forecast_ar,
+}
+
+
+def forecast_baseline(prices, steps=30, method="holt", **kwargs):
+    """Forecasts a `(tickers, days)` price matrix with the named baseline method."""
+    if method not in METHODS:
+        raise AnalysisError(f"Unknown baseline method '{method}'. Choose one of {sorted(METHODS)}.")
+    return METHODS[method](prices, steps=steps, **kwargs)
+
+
+def _forecast_dates(last_date, steps):
+    return pd.to_datetime(last_date) + pd.to_timedelta(range(1, steps + 1), unit="D")
+
+
+def forecast_stock_price_fast(df, steps=30, method="holt", **kwargs):
+    """
+    Drop-in alternative to `arima_model.forecast_stock_price` for a single ticker,
+    returning the same `(forecast, forecast_dates)` pair.
+    """
+    forecast_dates = _forecast_dates(df.index[-1], steps)
+    values = forecast_baseline(df["Close"].to_numpy(), steps=steps, method=method, **kwargs)[0]
+    return pd.Series(values, index=forecast_dates), forecast_dates
+
+
+def forecast_universe(close_prices, steps=30, method="holt", **kwargs):
+    """
+    Forecasts every column of a wide `(days, tickers)` DataFrame of closing prices, such as the
+    `Close` frame returned by `yf.download`. Gaps are forward-filled; tickers that still have missing
+    values (e.g. a listing younger than the window) are dropped.
+    Returns `(forecast, forecast_dates)` where `forecast` is a DataFrame indexed by `forecast_dates`.
+    """
+    close_prices = close_prices.ffill()
+    complete = close_prices.columns[close_prices.notna().all()]
+    dropped = len(close_prices.columns) - len(complete)
+    if dropped:
+        logging.warning(f"Skipping {dropped} tickers with incomplete price history.")
+
+    forecast_dates = _forecast_dates(close_prices.index[-1], steps)
+    values = forecast_baseline(close_prices[complete].to_numpy().T, steps=steps, method=method, **kwargs)
+    return pd.DataFrame(values.T, index=forecast_dates, columns=complete), forecast_dates
+
+
+def screen_universe(close_prices, steps=30, method="holt", **kwargs):
+    """Ranks tickers by the expected return of their baseline forecast over `steps` days."""
+    forecast, _ = forecast_universe(close_prices, steps=steps, method=method, **kwargs)
+    last_close = close_prices.ffill().iloc[-1][forecast.columns]
+    expected_return = forecast.iloc[-1] / last_close - 1
+    return expected_return.sort_values(ascending=False)
@@ -0,0 +1,225 @@
+"""
+Global cross-ticker LSTM.
+
+One network is trained offline on windows from many tickers and saved to disk, instead of a new network being
+trained for every request. Each window is normalized by its last close (log price relative to it), so tickers at
+any price level share one model, and the network predicts the next `horizon` log returns in one output. At
+request time the forecasts of any number of tickers come from a single batched forward pass.
+
+The last GLOBAL_LSTM_HOLDOUT_DAYS of every series are left out of training, and the metadata saved next to the
+model records the last trained date (`train_end`), so backtests only score the model on days it has not seen.
+A model without readable metadata is not used.
+
+Usage:
+    python -m api.analysis.global_lstm train AAPL MSFT GOOG ... [--period 5y] [--epochs 5]
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from tensorflow.keras.layers import LSTM, Dense
+from tensorflow.keras.models import Sequential, load_model
+
+from ..config import Config
+from ..data.stock_data import get_price_history
+from ..exceptions import AnalysisError, StockDataError
+from ..metrics import stage_timer
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+WINDOW = 60
+HORIZON = 30
+
+_model = None
+_model_mtime = None
+
+
+def make_windows(closes, window=WINDOW, horizon=HORIZON, stride=1):
+    """
+    Cuts one price series into normalized `(inputs, targets)` training pairs: `inputs` are
+    `(n, window, 1)` log prices relative to the window's last close, and `targets` are the `(n, horizon)`
+    log prices of the following days relative to the same close.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if len(closes) < window + horizon:
+        return np.empty((0, window, 1), dtype=np.float32), np.empty((0, horizon), dtype=np.float32)
+
+    spans = sliding_window_view(np.log(closes), window + horizon)[::stride]
+    relative = spans - spans[:, window - 1 : window]
+    return relative[:, :window, None].astype(np.float32), relative[:, window:].astype(np.float32)
+
+
+def build_training_set(price_series, window=WINDOW, horizon=HORIZON, stride=1):
+    """Concatenates the training windows of every series in `price_series` (an iterable of 1-D prices)."""
+    pairs = [make_windows(closes, window, horizon, stride) for closes in price_series]
+    if not pairs:
+        raise AnalysisError("No price series to train the global LSTM on.")
+    inputs = np.concatenate([x for x, _ in pairs])
+    targets = np.concatenate([y for _, y in pairs])
+    if not len(inputs):
+        raise AnalysisError(f"The price series are shorter than {window + horizon} days.")
+    return inputs, targets
+
+
+def create_global_model(window=WINDOW, horizon=HORIZON):
+    """Creates the global LSTM, which predicts `horizon` relative log prices at once."""
+    model = Sequential(
+        [
+            LSTM(64, return_sequences=True, input_shape=(window, 1)),
+            LSTM(64),
+            Dense(64),
+            Dense(horizon),
+        ]
+    )
+    model.compile(optimizer="adam", loss="mean_squared_error")
+    return model
+
+
+def train_global_model(
+    price_series, path=None, epochs=5, batch_size=256, window=WINDOW, horizon=HORIZON, tickers=(), train_end=None
+):
+    """
+    Trains the global model on windows from all the price series and saves it to `path` (by default
+    GLOBAL_LSTM_PATH), replacing any previous model atomically. `train_end` is the date of the last price in
+    the series, recorded in the metadata. Returns the model and its metadata.
+    """
+    path = path or Config.GLOBAL_LSTM_PATH
+    inputs, targets = build_training_set(price_series, window, horizon)
+    logging.info(f"Training the global LSTM on {len(inputs)} windows from {len(tickers) or 'unnamed'} tickers.")
+
+    with stage_timer("lstm_train"):
+        model = create_global_model(window, horizon)
+        history = model.fit(inputs, targets, epochs=epochs, batch_size=batch_size, shuffle=True, verbose=0)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{ext}"
+    model.save(tmp_path)
+    os.replace(tmp_path, path)
+
+    losses = getattr(history, "history", {}).get("loss") or [None]
+    meta = {
+        "trained_at": datetime.datetime.utcnow().isoformat(),
+        "window": window,
+        "horizon": horizon,
+        "windows": int(len(inputs)),
+        "tickers": list(tickers),
+        "train_end": train_end,
+        "loss": losses[-1],
+    }
+    tmp_meta_path = f"{root}.tmp{ext}.json"
+    with open(tmp_meta_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_meta_path, f"{path}.json")
+    logging.info(f"Saved the global LSTM to {path}.")
+    return model, meta
+
+
+def train_from_tickers(tickers, period="5y", path=None, epochs=None, holdout_days=None):
+    """
+    Fetches the tickers' price histories and trains and saves the global model, leaving out the last
+    `holdout_days` (by default GLOBAL_LSTM_HOLDOUT_DAYS) of each. Tickers without data are skipped.
+    """
+    epochs = Config.GLOBAL_LSTM_EPOCHS if epochs is None else epochs
+    holdout_days = Config.GLOBAL_LSTM_HOLDOUT_DAYS if holdout_days is None else holdout_days
+    prices, trained_tickers, end_dates = [], [], []
+    for ticker_symbol in tickers:
+        try:
+            closes = get_price_history(ticker_symbol, period=period).frame()["Close"]
+        except StockDataError as e:
+            logging.warning(f"Skipping {ticker_symbol} in global LSTM training: {e}")
+            continue
+        closes = closes.iloc[: len(closes) - holdout_days]
+        if closes.empty:
+            continue
+        prices.append(closes.to_numpy())
+        trained_tickers.append(ticker_symbol)
+        end_dates.append(closes.index[-1].date())
+    # The latest trained date of any ticker: later days are unseen by the model for every ticker.
+    train_end = max(end_dates).isoformat() if end_dates else None
+    return train_global_model(prices, path=path, epochs=epochs, tickers=trained_tickers, train_end=train_end)
+
+
+def get_global_model(path=None):
+    """
+    Returns the saved global model and its metadata as `(model, meta)`, loading the model on first use and
+    again whenever the file is replaced by a newer training run. Raises FileNotFoundError if no model has been
+    trained or its metadata is missing or unreadable, since its training run and held-out days are then unknown.
+    """
+    global _model, _model_mtime
+    path = path or Config.GLOBAL_LSTM_PATH
+    try:
+        meta = model_metadata(path)
+    except ValueError as e:
+        raise FileNotFoundError(f"The metadata of the global LSTM at {path} is unreadable: {e}") from e
+    mtime = os.path.getmtime(path)
+    if _model is None or mtime != _model_mtime:
+        _model = load_model(path)
+        _model_mtime = mtime
+        logging.info(f"Loaded the global LSTM from {path}.")
+    return _model, meta
+
+
+def model_metadata(path=None):
+    """Returns the metadata saved with the global model. Raises FileNotFoundError if no model has been trained."""
+    path = path or Config.GLOBAL_LSTM_PATH
+    with open(f"{path}.json") as f:
+        return json.load(f)
+
+
+def forecast_many(price_series, steps=30, model=None):
+    """
+    Forecasts `steps` days for each series in `price_series` (a `(tickers, days)` array or a list of 1-D
+    price arrays of any length of at least the model window) and returns a `(tickers, steps)` array.
+    All tickers go through each forward pass together; horizons beyond the model's output are reached by
+    feeding the forecasts back in.
+    """
+    model = model or get_global_model()[0]
+    window, horizon = model.input_shape[1], model.output_shape[-1]
+
+    series = [np.asarray(closes, dtype=np.float64) for closes in price_series]
+    if any(len(closes) < window for closes in series):
+        raise AnalysisError(f"The global LSTM needs at least {window} prices per ticker.")
+    windows = np.log(np.stack([closes[-window:] for closes in series]))
+
+    predicted = []
+    with stage_timer("lstm_predict"):
+        while sum(p.shape[1] for p in predicted) < steps:
+            relative = windows - windows[:, -1:]
+            outputs = np.asarray(
+                model.predict(relative[:, :, None].astype(np.float32), batch_size=len(windows), verbose=0)
+            )
+            log_prices = windows[:, -1:] + outputs.reshape(len(windows), horizon)
+            predicted.append(log_prices)
+            windows = np.concatenate([windows, log_prices], axis=1)[:, -window:]
+
+    return np.exp(np.concatenate(predicted, axis=1)[:, :steps])
+
+
+def forecast_with_global_lstm(data, steps=30):
+    """Forecasts one ticker's DataFrame with the global model, like `lstm_model.forecast_with_lstm`."""
+    return forecast_many([data["Close"].to_numpy()], steps=steps)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the global cross-ticker LSTM.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train = subparsers.add_parser("train")
+    train.add_argument("tickers", nargs="*", help="Defaults to GLOBAL_LSTM_TICKERS.")
+    train.add_argument("--period", default="5y")
+    train.add_argument("--epochs", type=int, default=Config.GLOBAL_LSTM_EPOCHS)
+    train.add_argument("--path", default=Config.GLOBAL_LSTM_PATH)
+    args = parser.parse_args(argv)
+
+    tickers = [ticker.upper() for ticker in args.tickers] or Config.GLOBAL_LSTM_TICKERS
+    _, meta = train_from_tickers(tickers, period=args.period, path=args.path, epochs=args.epochs)
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
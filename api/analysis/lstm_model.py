@@ -1,8 +1,14 @@
+import logging
+
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 from tensorflow.keras.layers import LSTM, Dense
 from tensorflow.keras.models import Sequential
 
+from ..config import Config
+from ..metrics import stage_timer
+from . import global_lstm
+
 
 def create_lstm_model(input_shape):
     """Creates a simple LSTM model."""
@@ -16,7 +22,20 @@ def create_lstm_model(input_shape):
     return model
 
 def forecast_with_lstm(data, steps=30):
-    """Forecasts stock prices using an LSTM model."""
+    """
+    Forecasts stock prices using an LSTM model. With LSTM_MODE "global" the forecast comes from the
+    pre-trained global model; otherwise, or if none has been trained yet, a model is trained on `data`.
+    """
+    if Config.LSTM_MODE == "global":
+        try:
+            return global_lstm.forecast_with_global_lstm(data, steps=steps)
+        except FileNotFoundError as e:
+            logging.warning(f"No usable global LSTM ({e}). Training a per-ticker model instead.")
+
+    return forecast_with_ticker_lstm(data, steps=steps)
+
+def forecast_with_ticker_lstm(data, steps=30):
+    """Forecasts stock prices with an LSTM model trained on `data` alone."""
     scaler = MinMaxScaler(feature_range=(0, 1))
     scaled_data = scaler.fit_transform(data['Close'].values.reshape(-1, 1))
 
@@ -29,17 +48,19 @@ def forecast_with_lstm(data, steps=30):
     x_train, y_train = np.array(x_train), np.array(y_train)
     x_train = np.reshape(x_train, (x_train.shape[0], x_train.shape[1], 1))
 
-    model = create_lstm_model(input_shape=(x_train.shape[1], 1))
-    model.fit(x_train, y_train, epochs=1, batch_size=1, verbose=0)
+    with stage_timer("lstm_train"):
+        model = create_lstm_model(input_shape=(x_train.shape[1], 1))
+        model.fit(x_train, y_train, epochs=1, batch_size=1, verbose=0)
 
     test_inputs = scaled_data[-prediction_days:].reshape(1, -1, 1)
     forecast = []
     current_input = test_inputs
 
-    for _ in range(steps):
-        predicted_price = model.predict(current_input)
-        forecast.append(predicted_price[0, 0])
-        current_input = np.append(current_input[:, 1:, :], [[predicted_price]], axis=1)
+    with stage_timer("lstm_predict"):
+        for _ in range(steps):
+            predicted_price = model.predict(current_input)
+            forecast.append(predicted_price[0, 0])
+            current_input = np.append(current_input[:, 1:, :], predicted_price.reshape(1, 1, 1), axis=1)
 
     forecast = scaler.inverse_transform(np.array(forecast).reshape(-1, 1))
     return forecast.flatten()
@@ -1,8 +1,19 @@
 from transformers import pipeline
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
+from ..metrics import timed
+
 analyzer = SentimentIntensityAnalyzer()
-finbert = pipeline('sentiment-analysis', model='ProsusAI/finbert')
+# The FinBERT pipeline is loaded on first use (or preloaded by the worker bootstrap in api/worker.py)
+# so that importing this module does not pull the model weights into every process.
+finbert = None
+
+def get_finbert():
+    """Returns the FinBERT sentiment pipeline, loading it on first use."""
+    global finbert
+    if finbert is None:
+        finbert = pipeline('sentiment-analysis', model='ProsusAI/finbert')
+    return finbert
 
 def get_sentiment_compound_score(text):
     """Returns the compound sentiment score from VADER."""
@@ -19,13 +30,14 @@ def classify_sentiment(compound_score):
     else:
         return "Neutral"
 
+@timed("finbert")
 def get_finbert_sentiment(posts):
     """Analyzes sentiment of Reddit posts using FinBERT."""
     if not posts or not isinstance(posts, list):
         return 0
 
     post_titles = [post['title'] for post in posts]
-    sentiments = finbert(post_titles)
+    sentiments = get_finbert()(post_titles)
 
     score_map = {'positive': 1, 'neutral': 0, 'negative': -1}
     total_score = sum(score_map.get(s['label'], 0) for s in sentiments)
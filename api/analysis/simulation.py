@@ -0,0 +1,94 @@
+"""
+Monte Carlo simulation of future price paths around a point forecast.
+
+Paths are drawn in chunks with NumPy, so thousands of paths take milliseconds and temporary memory is
+bounded by `chunk_size` regardless of the number of paths. The resulting percentile bands are what the
+chart payload uses to show forecast uncertainty.
+"""
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def arima_psi_weights(ar_polynomial, ma_polynomial, d, steps):
+    """
+    Computes the MA(infinity) weights of an ARIMA(p, d, q) model for the first `steps` lags.
+
+    The polynomials use the lag-polynomial convention of statsmodels results (`polynomial_ar` is
+    `[1, -phi_1, ..., -phi_p]` and `polynomial_ma` is `[1, theta_1, ..., theta_q]`). The forecast error at
+    horizon h is `sum(psi[j] * shock[h - j] for j < h)`.
+    """
+    ar = np.asarray(ar_polynomial, dtype=float)
+    for _ in range(d):
+        ar = np.convolve(ar, [1.0, -1.0])
+    ma = np.asarray(ma_polynomial, dtype=float)
+
+    psi = np.zeros(steps)
+    psi[0] = 1.0
+    for j in range(1, steps):
+        theta = ma[j] if j < len(ma) else 0.0
+        k = min(j, len(ar) - 1)
+        psi[j] = theta - np.dot(ar[1 : k + 1], psi[j - 1 :: -1][:k])
+    return psi
+
+
+def _impulse_matrix(psi):
+    """Builds the upper-triangular matrix that maps a row of shocks to cumulative forecast errors."""
+    steps = len(psi)
+    lags = np.arange(steps)[None, :] - np.arange(steps)[:, None]
+    return np.where(lags >= 0, psi[np.clip(lags, 0, None)], 0.0)
+
+
+def simulate_residual_paths(point_forecast, sigma2, psi=None, n_paths=5000, seed=42, chunk_size=1000):
+    """
+    Simulates price paths as the point forecast plus Gaussian shocks with the fitted residual variance.
+
+    `psi` are the MA(infinity) weights of the model (see `arima_psi_weights`); without them each shock
+    persists fully, as in a random walk. Returns a float32 array of shape `(n_paths, steps)`.
+    """
+    point_forecast = np.asarray(point_forecast, dtype=float)
+    steps = len(point_forecast)
+    psi = np.ones(steps) if psi is None else np.asarray(psi, dtype=float)[:steps]
+    impulse = _impulse_matrix(psi) * np.sqrt(sigma2)
+
+    rng = np.random.default_rng(seed)
+    paths = np.empty((n_paths, steps), dtype=np.float32)
+    for start in range(0, n_paths, chunk_size):
+        stop = min(start + chunk_size, n_paths)
+        shocks = rng.standard_normal((stop - start, steps))
+        paths[start:stop] = point_forecast + shocks @ impulse
+    return paths
+
+
+def simulate_bootstrap_paths(prices, steps=30, point_forecast=None, n_paths=5000, seed=42, chunk_size=1000):
+    """
+    Simulates price paths by resampling historical daily log returns with replacement.
+
+    Without a point forecast, paths start from the last price and follow the historical drift. With one,
+    the resampled returns are demeaned and the paths are centred on the point forecast, so the bands
+    describe the uncertainty around the model's own prediction. Returns a float32 array of shape `(n_paths, steps)`.
+    """
+    prices = np.asarray(prices, dtype=float)
+    log_returns = np.diff(np.log(prices))
+
+    if point_forecast is None:
+        base = np.full(steps, prices[-1])
+    else:
+        base = np.asarray(point_forecast, dtype=float)
+        steps = len(base)
+        log_returns = log_returns - log_returns.mean()
+
+    rng = np.random.default_rng(seed)
+    paths = np.empty((n_paths, steps), dtype=np.float32)
+    for start in range(0, n_paths, chunk_size):
+        stop = min(start + chunk_size, n_paths)
+        sampled = rng.choice(log_returns, size=(stop - start, steps), replace=True)
+        paths[start:stop] = base * np.exp(np.cumsum(sampled, axis=1))
+    return paths
+
+
+def percentile_bands(paths, percentiles=DEFAULT_PERCENTILES):
+    """Returns a dict mapping each percentile to the `(steps,)` band computed across the simulated paths."""
+    values = np.percentile(paths, percentiles, axis=0)
+    return dict(zip(percentiles, values))
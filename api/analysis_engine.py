@@ -1,9 +1,21 @@
 import plotly.graph_objects as go
 
+from .analysis.arima_model import (  # noqa: F401
+    find_best_arima_order,
+    forecast_stock_price,
+    forecast_stock_price_with_bands,
+)
+from .data.reddit_data import get_reddit_sentiment  # noqa: F401
+from .data.stock_data import calculate_technical_indicators, get_stock_data  # noqa: F401
+from .metrics import timed
 
-def create_plot(df, forecast, forecast_dates, ticker_symbol):
+
+@timed("plot")
+def create_plot(df, forecast, forecast_dates, ticker_symbol, bands=None):
     """
     Creates an interactive Plotly chart of the stock data and forecast.
+    If `bands` (a dict of percentile to band, as returned by `simulation.percentile_bands`) is given,
+    the widest percentile range is drawn as a shaded area around the forecast.
     """
     fig = go.Figure()
 
@@ -11,6 +23,24 @@ def create_plot(df, forecast, forecast_dates, ticker_symbol):
     fig.add_trace(go.Scatter(x=df.index, y=df["SMA50"], name="50-Day SMA", line={"color": "yellow", "dash": "dash"}))
     fig.add_trace(go.Scatter(x=df.index, y=df["SMA200"], name="200-Day SMA", line={"color": "red", "dash": "dash"}))
 
+    if bands:
+        lower, upper = min(bands), max(bands)
+        fig.add_trace(
+            go.Scatter(
+                x=forecast_dates, y=bands[upper], name=f"{upper}th Percentile", line={"width": 0}, showlegend=False
+            )
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=forecast_dates,
+                y=bands[lower],
+                name=f"{lower}th-{upper}th Percentile",
+                line={"width": 0},
+                fill="tonexty",
+                fillcolor="rgba(0, 128, 0, 0.2)",
+            )
+        )
+
     fig.add_trace(
         go.Scatter(
             x=forecast_dates, y=forecast, name="Sentiment-Adjusted Forecast", line={"color": "green", "dash": "dot"}
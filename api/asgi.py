@@ -0,0 +1,100 @@
+"""
+ASGI entry point with non-blocking read endpoints.
+
+The endpoints the frontend polls, `/status/<task_id>`, `/data/<ticker>` and `/hybrid_data/<ticker>`, are served
+by async handlers. They read the Celery result backend through a pooled `redis.asyncio` client and the database
+through a pooled async SQLAlchemy engine, so hundreds of polling clients wait on I/O on one event loop instead of
+holding a thread each. Every other route is passed through to the Flask app, which runs in a thread pool.
+
+Usage:
+    uvicorn api.asgi:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+
+import asyncio
+import contextlib
+
+import redis.asyncio as aioredis
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from . import app as flask_app
+from .config import Config
+from .database import AnalysisResult, async_database_url, engine_options
+from .tasks import celery_app
+from .utils import analysis_payload, hybrid_payload, status_payload
+
+
+def _uses_redis_results():
+    return Config.CELERY_RESULT_BACKEND.startswith(("redis://", "rediss://", "unix://"))
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    database_url = Config.ASYNC_DATABASE_URL or async_database_url(Config.DATABASE_URL)
+    app.state.engine = create_async_engine(database_url, **engine_options(database_url))
+    app.state.redis = None
+    if _uses_redis_results():
+        app.state.redis = aioredis.Redis.from_url(
+            Config.CELERY_RESULT_BACKEND, max_connections=Config.REDIS_MAX_CONNECTIONS
+        )
+    try:
+        yield
+    finally:
+        if app.state.redis is not None:
+            await app.state.redis.aclose()
+        await app.state.engine.dispose()
+
+
+def _sync_task_status(task_id):
+    task = celery_app.AsyncResult(task_id)
+    return status_payload(task.state, task.info)
+
+
+async def task_status(request):
+    task_id = request.path_params["task_id"]
+    redis = request.app.state.redis
+    if redis is None:
+        # Result backends without an async client (e.g. the in-memory one) are read in a thread.
+        return JSONResponse(await asyncio.to_thread(_sync_task_status, task_id))
+
+    backend = celery_app.backend
+    payload = await redis.get(backend.get_key_for_task(task_id))
+    if payload is None:
+        return JSONResponse(status_payload("PENDING", None))
+    meta = backend.decode_result(payload)
+    return JSONResponse(status_payload(meta["status"], meta["result"]))
+
+
+async def _fetch_result(request, *columns):
+    async with request.app.state.engine.connect() as connection:
+        result = await connection.execute(
+            select(*columns).where(AnalysisResult.ticker == request.path_params["ticker"]).limit(1)
+        )
+        return result.first()
+
+
+async def get_data(request):
+    row = await _fetch_result(
+        request, AnalysisResult.arima_plot, AnalysisResult.sentiment, AnalysisResult.sentiment_posts
+    )
+    return JSONResponse(analysis_payload(*row) if row else analysis_payload(None, None, None))
+
+
+async def hybrid_data(request):
+    row = await _fetch_result(request, AnalysisResult.hybrid_plot)
+    return JSONResponse(hybrid_payload(row[0] if row else None))
+
+
+app = Starlette(
+    routes=[
+        Route("/status/{task_id}", task_status),
+        Route("/data/{ticker}", get_data),
+        Route("/hybrid_data/{ticker}", hybrid_data),
+        Mount("/", app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan,
+)
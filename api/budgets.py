@@ -0,0 +1,115 @@
+"""
+Per-stage time budgets of the analysis tasks.
+
+Each stage of an analysis (fetching prices, the ARIMA forecast, the LSTM forecast, sentiment) has a soft and a
+hard budget in seconds, set by STAGE_BUDGETS. Past its soft budget a stage degrades where it can: the ARIMA order
+search stops trying orders and keeps the best one found so far, or the default order. At its hard budget a stage
+is interrupted with a `StageTimeoutError`; the analysis tasks then skip sentiment and mark the result partial, or
+fail for the other stages. Overruns of either budget are counted in `prestocked_stage_budget_exceeded_total`.
+
+Stages are interrupted with SIGALRM, which is only delivered to the main thread, where the prefork worker
+children run their tasks. In other threads (eager tasks inside the Flask server, thread pools) a stage runs to
+completion and its overruns are only recorded. The Celery time limits of the analysis tasks bound each whole task
+regardless.
+"""
+
+import contextlib
+import logging
+import signal
+import threading
+import time
+
+from .config import Config
+from .exceptions import StageTimeoutError
+from .metrics import DEGRADED_STAGES, STAGE_BUDGET_EXCEEDED
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+_local = threading.local()
+
+
+def parse_stage_budgets(value):
+    """
+    Parses a budget specification such as "arima=20:90;sentiment=15:45" into a mapping of stage to
+    `(soft seconds, hard seconds)`. A budget of 0 or one left out is disabled (None).
+    """
+    budgets = {}
+    for entry in (value or "").split(";"):
+        if not entry.strip():
+            continue
+        stage, _, budget = entry.partition("=")
+        soft, _, hard = budget.partition(":")
+        budgets[stage.strip()] = (float(soft or 0) or None, float(hard or 0) or None)
+    return budgets
+
+
+def can_interrupt():
+    """Whether a stage running in this thread can be interrupted at its hard budget."""
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+class StageBudget:
+    """The budgets of one run of a stage, measured from its start on the `time.monotonic()` clock."""
+
+    def __init__(self, stage, soft=None, hard=None):
+        self.stage = stage
+        self.soft = soft
+        self.hard = hard
+        self.start = time.monotonic()
+        # Set when the stage fell back to a cheaper result (see `mark_degraded`).
+        self.degraded = False
+
+    @property
+    def soft_deadline(self):
+        """The `time.monotonic()` value at which the soft budget runs out, or None without a soft budget."""
+        return None if self.soft is None else self.start + self.soft
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+
+@contextlib.contextmanager
+def stage_budget(stage, budgets=None):
+    """
+    Runs the block as one run of `stage` and yields its `StageBudget`. Where possible the block is interrupted
+    with a `StageTimeoutError` at the hard budget. `budgets` defaults to the parsed STAGE_BUDGETS.
+    """
+    if budgets is None:
+        budgets = parse_stage_budgets(Config.STAGE_BUDGETS)
+    soft, hard = budgets.get(stage, (None, None))
+    budget = StageBudget(stage, soft, hard)
+    interrupt = hard is not None and can_interrupt()
+
+    if interrupt:
+
+        def on_alarm(signum, frame):
+            raise StageTimeoutError(f"The {stage} stage exceeded its time budget of {hard:g} seconds.")
+
+        previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, hard)
+    previous_budget, _local.budget = getattr(_local, "budget", None), budget
+    try:
+        yield budget
+    finally:
+        if interrupt:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+        _local.budget = previous_budget
+        _record_overruns(budget)
+
+
+def _record_overruns(budget):
+    elapsed = budget.elapsed()
+    if budget.soft is not None and elapsed >= budget.soft:
+        STAGE_BUDGET_EXCEEDED.labels(stage=budget.stage, budget="soft").inc()
+    if budget.hard is not None and elapsed >= budget.hard:
+        STAGE_BUDGET_EXCEEDED.labels(stage=budget.stage, budget="hard").inc()
+        logging.warning(f"The {budget.stage} stage took {elapsed:.1f}s, over its hard budget of {budget.hard:g}s.")
+
+
+def mark_degraded(stage):
+    """Records that `stage` fell back to a cheaper result, on the budget of the stage running in this thread."""
+    DEGRADED_STAGES.labels(stage=stage).inc()
+    budget = getattr(_local, "budget", None)
+    if budget is not None:
+        budget.degraded = True
@@ -42,6 +42,116 @@ class Config:
     # The URL for the result backend (also Redis). Celery uses this to store the results and status of tasks.
     CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
 
+    # Set to "true" to run Celery tasks in-process (eagerly) instead of sending them to a worker.
+    # Combined with CELERY_BROKER_URL=memory:// and CELERY_RESULT_BACKEND=cache+memory:// this needs no Redis.
+    CELERY_TASK_ALWAYS_EAGER = os.environ.get("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true"
+
+    # --- Data Provider Configuration ---
+    # "yahoo" fetches real data from Yahoo Finance and Reddit. "synthetic" serves deterministic generated data
+    # (see api/data/synthetic.py) so the whole pipeline can be load-tested offline.
+    DATA_PROVIDER = os.environ.get("DATA_PROVIDER", "yahoo")
+    # Mean latency added to each synthetic Yahoo Finance or Reddit call, in milliseconds.
+    SYNTHETIC_LATENCY_MS = float(os.environ.get("SYNTHETIC_LATENCY_MS", 0))
+    # Fraction of synthetic calls that fail.
+    SYNTHETIC_ERROR_RATE = float(os.environ.get("SYNTHETIC_ERROR_RATE", 0))
+
+    # Fraction of synthetic calls that are throttled ("too many requests"), exercising the rate limiter's backoff.
+    SYNTHETIC_THROTTLE_RATE = float(os.environ.get("SYNTHETIC_THROTTLE_RATE", 0))
+
+    # --- Rate Limiting Configuration ---
+    # Request budgets shared by all workers, per provider, as "<provider>=<requests per second>:<burst>;...".
+    RATE_LIMITS = os.environ.get("RATE_LIMITS", "yahoo=2:5;reddit=1:3")
+    # The Redis server holding the shared token buckets. A non-Redis URL (e.g. memory://) uses in-process buckets.
+    RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL", CELERY_BROKER_URL)
+    # Retries of a throttled call, with full-jitter exponential backoff between BASE and CAP seconds.
+    RATE_LIMIT_RETRIES = int(os.environ.get("RATE_LIMIT_RETRIES", 4))
+    RATE_LIMIT_BACKOFF_BASE = float(os.environ.get("RATE_LIMIT_BACKOFF_BASE", 0.5))
+    RATE_LIMIT_BACKOFF_CAP = float(os.environ.get("RATE_LIMIT_BACKOFF_CAP", 30))
+
+    # --- Connection Pool Configuration ---
+    # Database connections kept open per process (and extra connections allowed under bursts).
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    # The async database URL used by the ASGI read endpoints (api/asgi.py). Derived from DATABASE_URL by default,
+    # e.g. postgresql:// becomes postgresql+asyncpg://.
+    ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL")
+    # Maximum connections in the async Redis pool of each ASGI process.
+    REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", 100))
+
     # --- Cache Configuration ---
     # The time in hours to cache the analysis results.
     CACHE_TIME = int(os.environ.get("CACHE_TIME", 1))
+
+    # Bound on the bytes of compact price histories each worker process keeps in memory (see api/data/price_cache.py).
+    PRICE_CACHE_MAX_BYTES = int(os.environ.get("PRICE_CACHE_MAX_BYTES", 64 * 1024**2))
+    # Seconds a cached price history is reused before it is fetched again.
+    PRICE_CACHE_TTL = int(os.environ.get("PRICE_CACHE_TTL", 900))
+
+    # --- LSTM Configuration ---
+    # "per_ticker" trains a small LSTM for every forecast; "global" serves forecasts from one cross-ticker model
+    # trained offline (python -m api.analysis.global_lstm train) and retrained by the Celery beat schedule.
+    LSTM_MODE = os.environ.get("LSTM_MODE", "per_ticker")
+    GLOBAL_LSTM_PATH = os.environ.get("GLOBAL_LSTM_PATH", "models/global_lstm.keras")
+    # The tickers the global model is trained on.
+    GLOBAL_LSTM_TICKERS = tuple(
+        ticker.strip().upper()
+        for ticker in os.environ.get(
+            "GLOBAL_LSTM_TICKERS", "AAPL,MSFT,GOOGL,AMZN,META,NVDA,TSLA,JPM,V,JNJ,WMT,PG,XOM,UNH,HD"
+        ).split(",")
+        if ticker.strip()
+    )
+    GLOBAL_LSTM_EPOCHS = int(os.environ.get("GLOBAL_LSTM_EPOCHS", 5))
+    # Trading days at the end of each series left out of training, so backtests can score the global model on
+    # days it has not seen. The backtest only scores days after the model's last trained date.
+    GLOBAL_LSTM_HOLDOUT_DAYS = int(os.environ.get("GLOBAL_LSTM_HOLDOUT_DAYS", 50))
+    # Hour (UTC) of the daily scheduled retraining of the global model.
+    GLOBAL_LSTM_TRAIN_HOUR = int(os.environ.get("GLOBAL_LSTM_TRAIN_HOUR", 2))
+
+    # --- Sentiment Configuration ---
+    # "live" analyzes Reddit during each simple analysis; "stored" forecasts with ARIMAX on the daily sentiment
+    # collected by the scheduled sentiment job, so the request path makes no Reddit calls.
+    SENTIMENT_SOURCE = os.environ.get("SENTIMENT_SOURCE", "live")
+    # Tickers the scheduled job collects daily sentiment for, in addition to the recently analyzed ones.
+    SENTIMENT_TICKERS = tuple(
+        ticker.strip().upper() for ticker in os.environ.get("SENTIMENT_TICKERS", "").split(",") if ticker.strip()
+    )
+    # Analyzed tickers stay tracked for this many days after their last analysis.
+    SENTIMENT_ACTIVE_DAYS = int(os.environ.get("SENTIMENT_ACTIVE_DAYS", 14))
+    # Upper bound on the tickers collected per run (configured ones first), which bounds the Reddit requests.
+    SENTIMENT_MAX_TICKERS = int(os.environ.get("SENTIMENT_MAX_TICKERS", 25))
+    # Minutes between runs of the scheduled sentiment job.
+    SENTIMENT_UPDATE_MINUTES = int(os.environ.get("SENTIMENT_UPDATE_MINUTES", 60))
+
+    # --- Time Budget Configuration ---
+    # Soft and hard time budgets of the analysis stages in seconds, as "<stage>=<soft>:<hard>;..." (0 disables one).
+    # Stages: fetch, arima, lstm, sentiment, and backtest_arima and backtest_lstm for the predictions of a backtest.
+    # Past its soft budget the ARIMA order search keeps the best order found so far; at its hard budget a stage is
+    # interrupted, which skips sentiment and fails the other stages.
+    STAGE_BUDGETS = os.environ.get(
+        "STAGE_BUDGETS",
+        "fetch=20:60;arima=20:90;lstm=60:180;sentiment=15:45;backtest_arima=0:1800;backtest_lstm=0:3600",
+    )
+    # Celery time limits of a whole analysis task in seconds: the soft limit fails the task, the hard limit kills
+    # the worker child running it.
+    ANALYSIS_SOFT_TIME_LIMIT = int(os.environ.get("ANALYSIS_SOFT_TIME_LIMIT", 420))
+    ANALYSIS_TIME_LIMIT = int(os.environ.get("ANALYSIS_TIME_LIMIT", 480))
+
+    # --- Worker Configuration ---
+    # Models to preload in the Celery parent process before the pool forks, per queue.
+    # The format is "<queue>=<model>,<model>;<queue>=<model>", e.g. "celery=finbert,lstm;backtest=lstm".
+    # Supported models are "finbert" and "lstm". Children share the preloaded weights through copy-on-write.
+    WORKER_PRELOAD_MODELS = os.environ.get("WORKER_PRELOAD_MODELS", "celery=finbert,lstm")
+    # Recycle a worker child after it has executed this many tasks (0 disables the limit).
+    WORKER_MAX_TASKS_PER_CHILD = int(os.environ.get("WORKER_MAX_TASKS_PER_CHILD", 100))
+    # Recycle a worker child once its resident memory exceeds this many kilobytes (0 disables the limit).
+    WORKER_MAX_MEMORY_PER_CHILD = int(os.environ.get("WORKER_MAX_MEMORY_PER_CHILD", 3_000_000))
+
+    # --- Backtesting Configuration ---
+    # Directory where the multi-ticker backtest runner checkpoints completed work units.
+    BACKTEST_RUN_DIR = os.environ.get("BACKTEST_RUN_DIR", "backtest_runs")
+
+    # --- Profiling Configuration ---
+    # Directory where task profiles are saved, one subdirectory per task id.
+    PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+    # Fraction of analysis tasks to profile even without the profile header (0 disables sampling).
+    PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
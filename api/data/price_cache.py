@@ -0,0 +1,136 @@
+"""
+Worker-level cache of compact price histories.
+
+A yfinance history carries every OHLCV, dividend and split column in float64, while the models and indicators
+only read the close. The cache keeps just `PRICE_COLUMNS` as one contiguous, read-only float32 block with its
+datetime64 index, bounded by total bytes with least-recently-used eviction and a maximum age. Each caller gets a
+new DataFrame that wraps the cached arrays without copying them, so the stages of a task and the tasks that run
+in the same worker process share one fetch. Columns a caller adds (such as moving averages) stay in its own
+DataFrame, and the cached arrays are read-only, so no caller can modify another's prices.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ..config import Config
+from ..metrics import record_cache
+
+PRICE_COLUMNS = ("Close",)
+
+
+class PriceHistory:
+    """An immutable price history: a `(columns, days)` float32 block and its DatetimeIndex."""
+
+    def __init__(self, values, index, columns=PRICE_COLUMNS, info=None):
+        values = np.ascontiguousarray(values, dtype=np.float32)
+        values.flags.writeable = False
+        self.values = values
+        self.index = index
+        self.columns = list(columns)
+        # The company information fetched with the history, if any.
+        self.info = info
+
+    @classmethod
+    def from_frame(cls, hist, columns=PRICE_COLUMNS, info=None):
+        """Compacts a yfinance history DataFrame to the given columns."""
+        return cls(hist[list(columns)].to_numpy(dtype=np.float32).T, pd.DatetimeIndex(hist.index), columns, info)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.index.nbytes
+
+    def frame(self):
+        """Returns a DataFrame backed by the cached arrays (no copy)."""
+        return pd.DataFrame(self.values.T, index=self.index, columns=self.columns, copy=False)
+
+
+class _Load:
+    """A load of one key in progress: the lock its callers queue on, how many hold it, and the loaded history."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.callers = 0
+        self.history = None
+
+
+class PriceCache:
+    """A thread-safe LRU cache of `PriceHistory` objects, bounded by total bytes and entry age."""
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+        self.loading = {}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            history, loaded_at = entry
+            if time.monotonic() - loaded_at > self.ttl:
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return history
+
+    def put(self, key, history):
+        if history.nbytes > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (history, time.monotonic())
+            self.nbytes += history.nbytes
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def get_or_load(self, key, loader, accept=None):
+        """
+        Returns the cached history for `key`, calling `loader()` on a miss. Concurrent misses for the same key
+        in this process wait for a single load. `accept(history)` can reject a cached entry, forcing a reload.
+        """
+        history = self.get(key)
+        if history is not None and (accept is None or accept(history)):
+            record_cache("price", hit=True)
+            return history
+
+        # The load stays registered until its last caller is done, so every caller that arrives while it is in
+        # progress queues on the same lock and is handed its result, even one the cache does not keep.
+        with self.lock:
+            load = self.loading.setdefault(key, _Load())
+            load.callers += 1
+        try:
+            with load.lock:
+                for history in (load.history, self.get(key)):
+                    if history is not None and (accept is None or accept(history)):
+                        record_cache("price", hit=True)
+                        return history
+                record_cache("price", hit=False)
+                history = loader()
+                self.put(key, history)
+                load.history = history
+        finally:
+            with self.lock:
+                load.callers -= 1
+                if not load.callers:
+                    del self.loading[key]
+        return history
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def _remove(self, key):
+        history, _ = self.entries.pop(key)
+        self.nbytes -= history.nbytes
+
+
+PRICE_CACHE = PriceCache(Config.PRICE_CACHE_MAX_BYTES, Config.PRICE_CACHE_TTL)
@@ -1,18 +1,33 @@
+import datetime
 import logging
+from collections import defaultdict
 
 import praw
+import prawcore
 
 from ..analysis.sentiment import classify_sentiment, get_sentiment_compound_score
 from ..config import Config
 from ..exceptions import RedditAPIError
+from ..metrics import timed
+from ..ratelimit import call_with_backoff
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 POST_LIMIT = 25  # Number of posts to fetch from Reddit
 COMMENT_LIMIT = 10  # Number of top comments per post to fetch
+DAILY_POST_LIMIT = 100  # Number of recent posts to aggregate into daily sentiment
+
+def _load_comments(post):
+    """Fetches a submission's comment forest (one Reddit request) and returns it as a flat list."""
+    post.comments.replace_more(limit=0)
+    return post.comments.list()
 
 def get_reddit_client():
-    """Creates and returns an authenticated PRAW Reddit client."""
+    """Creates and returns an authenticated PRAW Reddit client, or its synthetic stand-in when DATA_PROVIDER is "synthetic"."""
+    if Config.DATA_PROVIDER == "synthetic":
+        from .synthetic import FakeReddit
+
+        return FakeReddit(n_posts=POST_LIMIT, n_comments=COMMENT_LIMIT)
     try:
         reddit = praw.Reddit(
             client_id=Config.REDDIT_CLIENT_ID,
@@ -26,6 +41,51 @@ def get_reddit_client():
         logging.error(f"Error initializing PRAW: {e}")
         raise RedditAPIError("Could not connect to Reddit. Please check your API credentials and network connection.") from e
 
+def _search(reddit, ticker_symbol, limit, **kwargs):
+    subreddit = reddit.subreddit("all")
+    # The search listing is fetched lazily, so it is consumed inside the rate-limited call.
+    return call_with_backoff("reddit", lambda: list(subreddit.search(ticker_symbol, limit=limit, **kwargs)))
+
+def _analyze_post(post):
+    """Scores a submission and its top comments. Returns the weighted scores and the post summary."""
+    title_score = get_sentiment_compound_score(post.title)
+    body_score = get_sentiment_compound_score(post.selftext)
+
+    weighted_scores = []
+    post_weight = post.score + 1
+    weighted_scores.append({'score': title_score, 'weight': post_weight})
+    if post.selftext:
+        weighted_scores.append({'score': body_score, 'weight': post_weight})
+
+    post_comments = []
+    comment_list = call_with_backoff("reddit", _load_comments, post)
+
+    for comment in comment_list[:COMMENT_LIMIT]:
+        comment_score = get_sentiment_compound_score(comment.body)
+        comment_weight = comment.score + 1
+        weighted_scores.append({'score': comment_score, 'weight': comment_weight})
+        post_comments.append({
+            'body': comment.body,
+            'author': comment.author.name if comment.author else "[deleted]",
+            'score': comment.score,
+            'sentiment': classify_sentiment(comment_score)
+        })
+
+    analyzed_post = {
+        'title': post.title,
+        'url': post.url,
+        'score': post.score,
+        'sentiment': classify_sentiment(title_score),
+        'comments': post_comments
+    }
+    return weighted_scores, analyzed_post
+
+def _weighted_mean(weighted_scores):
+    total_weight = sum(item['weight'] for item in weighted_scores)
+    weighted_sum = sum(item['score'] * item['weight'] for item in weighted_scores)
+    return weighted_sum / total_weight if total_weight > 0 else 0
+
+@timed("reddit_fetch")
 def get_reddit_sentiment(ticker_symbol):
     """
     Fetches and analyzes Reddit sentiment for a given stock ticker.
@@ -35,52 +95,42 @@ def get_reddit_sentiment(ticker_symbol):
     analyzed_posts = []
 
     try:
-        subreddit = reddit.subreddit("all")
-        submissions = subreddit.search(ticker_symbol, limit=POST_LIMIT)
-
-        for post in submissions:
-            title_score = get_sentiment_compound_score(post.title)
-            body_score = get_sentiment_compound_score(post.selftext)
-
-            post_weight = post.score + 1
-            weighted_scores.append({'score': title_score, 'weight': post_weight})
-            if post.selftext:
-                weighted_scores.append({'score': body_score, 'weight': post_weight})
-
-            post_comments = []
-            post.comments.replace_more(limit=0)
-
-            comment_list = post.comments.list()
-
-            for comment in comment_list[:COMMENT_LIMIT]:
-                comment_score = get_sentiment_compound_score(comment.body)
-                comment_weight = comment.score + 1
-                weighted_scores.append({'score': comment_score, 'weight': comment_weight})
-                post_comments.append({
-                    'body': comment.body,
-                    'author': comment.author.name if comment.author else "[deleted]",
-                    'score': comment.score,
-                    'sentiment': classify_sentiment(comment_score)
-                })
-
-            analyzed_posts.append({
-                'title': post.title,
-                'url': post.url,
-                'score': post.score,
-                'sentiment': classify_sentiment(title_score),
-                'comments': post_comments
-            })
+        for post in _search(reddit, ticker_symbol, POST_LIMIT):
+            post_scores, analyzed_post = _analyze_post(post)
+            weighted_scores.extend(post_scores)
+            analyzed_posts.append(analyzed_post)
 
         if not weighted_scores:
             return 0, [], f"No results found for '{ticker_symbol}'."
 
-        total_weight = sum(item['weight'] for item in weighted_scores)
-        weighted_sum = sum(item['score'] * item['weight'] for item in weighted_scores)
+        return _weighted_mean(weighted_scores), analyzed_posts, None
 
-        final_compound_score = weighted_sum / total_weight if total_weight > 0 else 0
+    except prawcore.exceptions.PrawcoreException as e:
+        logging.error(f"An error occurred during Reddit search: {e}")
+        raise RedditAPIError("An error occurred while fetching data from Reddit.") from e
 
-        return final_compound_score, analyzed_posts, None
+@timed("reddit_fetch")
+def get_daily_reddit_sentiment(ticker_symbol, limit=DAILY_POST_LIMIT, since=None):
+    """
+    Aggregates the sentiment of the ticker's most recent Reddit posts by the UTC day they were posted.
+    Posts are read newest first. With `since` (a date), reading stops at the first post from before that day,
+    so older posts are not scored and their comments are not fetched.
+    Returns a mapping of date to `(weighted compound score, number of posts)`.
+    """
+    reddit = get_reddit_client()
+    scores_by_day = defaultdict(list)
+    posts_by_day = defaultdict(int)
 
-    except praw.exceptions.PrawcoreException as e:
+    try:
+        for post in _search(reddit, ticker_symbol, limit, sort="new", time_filter="week"):
+            day = datetime.datetime.fromtimestamp(post.created_utc, tz=datetime.timezone.utc).date()
+            if since is not None and day < since:
+                break
+            post_scores, _ = _analyze_post(post)
+            scores_by_day[day].extend(post_scores)
+            posts_by_day[day] += 1
+    except prawcore.exceptions.PrawcoreException as e:
         logging.error(f"An error occurred during Reddit search: {e}")
         raise RedditAPIError("An error occurred while fetching data from Reddit.") from e
+
+    return {day: (_weighted_mean(scores), posts_by_day[day]) for day, scores in scores_by_day.items()}
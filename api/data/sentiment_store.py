@@ -0,0 +1,98 @@
+"""
+Daily Reddit sentiment history per ticker.
+
+The scheduled sentiment job aggregates each ticker's recent Reddit posts by day and stores one row per
+(ticker, day) in the `daily_sentiment` table. Days before the last stored one are final: reading the newest
+posts stops at them, so their posts are not scored and their comments are not fetched again. The last stored
+day is re-aggregated, since it may have been collected before the day was over. The job tracks the configured
+tickers and a bounded number of recently analyzed ones, so the shared Reddit budget is left for live analyses.
+Forecasts read the history from the database (as an exogenous regressor for ARIMAX), so they need no Reddit
+call on the request path.
+"""
+
+import datetime
+import logging
+
+import numpy as np
+import pandas as pd
+
+from ..config import Config
+from ..database import AnalysisResult, DailySentiment, db_session
+from .reddit_data import get_daily_reddit_sentiment
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def last_sentiment_date(session, ticker_symbol):
+    return (
+        session.query(DailySentiment.date)
+        .filter_by(ticker=ticker_symbol)
+        .order_by(DailySentiment.date.desc())
+        .limit(1)
+        .scalar()
+    )
+
+
+def update_daily_sentiment(ticker_symbol, session=None):
+    """
+    Fetches the ticker's recent posts and upserts the daily aggregates from the last stored day onwards.
+    Returns the number of days written.
+    """
+    session = session or db_session
+    ticker_symbol = ticker_symbol.upper()
+    last_date = last_sentiment_date(session, ticker_symbol)
+
+    daily = {
+        day: aggregate
+        for day, aggregate in get_daily_reddit_sentiment(ticker_symbol, since=last_date).items()
+        if last_date is None or day >= last_date
+    }
+    if not daily:
+        return 0
+
+    existing = {
+        row.date: row
+        for row in session.query(DailySentiment).filter(
+            DailySentiment.ticker == ticker_symbol, DailySentiment.date.in_(list(daily))
+        )
+    }
+    for day, (score, posts) in daily.items():
+        row = existing.get(day)
+        if row is None:
+            session.add(DailySentiment(ticker=ticker_symbol, date=day, score=score, posts=posts))
+        else:
+            row.score, row.posts = score, posts
+    session.commit()
+    logging.info(f"Stored {len(daily)} days of Reddit sentiment for {ticker_symbol}.")
+    return len(daily)
+
+
+def tracked_tickers(configured, session=None, max_tickers=None, active_days=None):
+    """
+    Returns the configured tickers plus the tickers analyzed in the last `active_days` days, most recently
+    analyzed first, without duplicates and at most `max_tickers` in all. The limits default to
+    SENTIMENT_ACTIVE_DAYS and SENTIMENT_MAX_TICKERS.
+    """
+    session = session or db_session
+    max_tickers = Config.SENTIMENT_MAX_TICKERS if max_tickers is None else max_tickers
+    active_days = Config.SENTIMENT_ACTIVE_DAYS if active_days is None else active_days
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=active_days)
+    analyzed = [
+        ticker
+        for (ticker,) in session.query(AnalysisResult.ticker)
+        .filter(AnalysisResult.last_updated >= cutoff)
+        .order_by(AnalysisResult.last_updated.desc())
+    ]
+    return list(dict.fromkeys([ticker.upper() for ticker in configured] + analyzed))[:max_tickers]
+
+
+def load_daily_sentiment(ticker_symbol, start_date=None, session=None):
+    """Returns the stored daily sentiment of a ticker as a Series indexed by date (empty if none is stored)."""
+    session = session or db_session
+    query = session.query(DailySentiment.date, DailySentiment.score).filter(
+        DailySentiment.ticker == ticker_symbol.upper()
+    )
+    if start_date is not None:
+        query = query.filter(DailySentiment.date >= start_date)
+    rows = query.order_by(DailySentiment.date).all()
+    return pd.Series([score for _, score in rows], index=pd.DatetimeIndex([day for day, _ in rows]), dtype=np.float64)
@@ -2,27 +2,57 @@ import logging
 
 import yfinance as yf
 
+from ..config import Config
 from ..exceptions import StockDataError
+from ..metrics import timed
+from ..ratelimit import call_with_backoff
+from .price_cache import PRICE_CACHE, PriceHistory
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def get_ticker(ticker_symbol):
+    """Returns a Yahoo Finance ticker, or its synthetic stand-in when DATA_PROVIDER is "synthetic"."""
+    if Config.DATA_PROVIDER == "synthetic":
+        from .synthetic import SyntheticTicker
+
+        return SyntheticTicker(ticker_symbol)
+    return yf.Ticker(ticker_symbol)
+
+def _fetch_price_history(ticker_symbol, period, with_info):
+    ticker = get_ticker(ticker_symbol)
+    info = call_with_backoff("yahoo", lambda: ticker.info) if with_info else None
+    hist = call_with_backoff("yahoo", ticker.history, period=period)
+    if hist.empty:
+        raise StockDataError(f"No historical data found for {ticker_symbol}")
+    if with_info and ('longName' not in info or 'symbol' not in info):
+        raise StockDataError(f"Incomplete company information for {ticker_symbol}")
+    return PriceHistory.from_frame(hist, info=info)
+
+def get_price_history(ticker_symbol, period="5y", with_info=False):
+    """
+    Returns the compact price history of a ticker from the worker's price cache, fetching it on a miss.
+    With `with_info`, the company information is fetched and cached along with it.
+    """
+    return PRICE_CACHE.get_or_load(
+        (ticker_symbol.upper(), period),
+        lambda: _fetch_price_history(ticker_symbol, period, with_info),
+        accept=lambda history: history.info is not None or not with_info,
+    )
+
+@timed("fetch")
 def get_stock_data(ticker_symbol):
     """
     Fetches historical stock data and company information from Yahoo Finance.
+    The history is served from the worker's price cache as a read-only DataFrame of the close prices.
     """
     try:
-        ticker = yf.Ticker(ticker_symbol)
-        info = ticker.info
-        hist = ticker.history(period="5y")
-        if hist.empty:
-            raise StockDataError(f"No historical data found for {ticker_symbol}")
-        if 'longName' not in info or 'symbol' not in info:
-            raise StockDataError(f"Incomplete company information for {ticker_symbol}")
-        return info, hist
+        history = get_price_history(ticker_symbol, period="5y", with_info=True)
+        return history.info, history.frame()
     except Exception as e:
         logging.error(f"Error fetching stock data for {ticker_symbol}: {e}")
         raise StockDataError(f"An error occurred while fetching data for {ticker_symbol} from Yahoo Finance.") from e
 
+@timed("indicators")
 def calculate_technical_indicators(df):
     """
     Calculates 50-day and 200-day Simple Moving Averages (SMA).
@@ -0,0 +1,204 @@
+"""
+Deterministic synthetic stand-ins for Yahoo Finance and Reddit data.
+
+These generate price histories shaped like `yf.Ticker(...).history()` and objects that behave like the
+parts of PRAW used by `reddit_data`, so benchmarks, tests and load tests can run the real pipeline fully
+offline. The same seed always produces the same data. Set DATA_PROVIDER=synthetic to use them in place of
+Yahoo Finance and Reddit, with optional injected latency and errors.
+"""
+
+import random
+import re
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+from prawcore.exceptions import PrawcoreException
+
+from ..config import Config
+
+TRADING_DAYS_PER_YEAR = 252
+
+POSITIVE_PHRASES = ["great earnings beat", "strong buy", "huge upside", "love this stock", "bullish breakout"]
+NEGATIVE_PHRASES = ["terrible guidance", "selling everything", "awful quarter", "bearish crash", "overvalued"]
+NEUTRAL_PHRASES = ["holding for now", "what do you think", "earnings next week", "any news", "chart update"]
+
+
+def ticker_seed(ticker_symbol, seed=0):
+    """Derives a stable per-ticker seed, so different tickers get different but reproducible data."""
+    return zlib.crc32(ticker_symbol.upper().encode()) + seed
+
+
+def generate_price_history(years=5, seed=0, start_price=100.0, end="2025-01-01"):
+    """
+    Generates a geometric random walk of daily OHLCV data over business days, with the same columns
+    as a yfinance history DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end, periods=int(years * TRADING_DAYS_PER_YEAR), name="Date")
+
+    returns = rng.normal(0.0003, 0.015, len(index))
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = close * np.exp(rng.normal(0, 0.005, len(index)))
+    spread = np.abs(rng.normal(0, 0.01, len(index)))
+
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) * (1 + spread),
+            "Low": np.minimum(open_, close) * (1 - spread),
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 50_000_000, len(index)),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        },
+        index=index,
+    )
+
+
+def generate_company_info(ticker_symbol):
+    """Returns the subset of `yf.Ticker(...).info` that `get_stock_data` checks for."""
+    return {"symbol": ticker_symbol.upper(), "longName": f"{ticker_symbol.upper()} Synthetic Inc."}
+
+
+class SyntheticProviderError(Exception):
+    """Raised by the synthetic Yahoo Finance stand-in to simulate a failed request."""
+
+
+class SyntheticRateLimitError(SyntheticProviderError):
+    """Raised by the synthetic providers to simulate a "too many requests" response."""
+
+
+def simulate_request(error, latency=None, error_rate=None, throttle_rate=None):
+    """
+    Sleeps for a jittered latency, then is throttled or fails with `error` at the configured rates, like a
+    remote call would. Defaults come from SYNTHETIC_LATENCY_MS, SYNTHETIC_THROTTLE_RATE and SYNTHETIC_ERROR_RATE.
+    """
+    latency = Config.SYNTHETIC_LATENCY_MS / 1000 if latency is None else latency
+    error_rate = Config.SYNTHETIC_ERROR_RATE if error_rate is None else error_rate
+    throttle_rate = Config.SYNTHETIC_THROTTLE_RATE if throttle_rate is None else throttle_rate
+    if latency > 0:
+        time.sleep(random.uniform(0.5, 1.5) * latency)
+    if throttle_rate > 0 and random.random() < throttle_rate:
+        raise SyntheticRateLimitError("Too Many Requests")
+    if error_rate > 0 and random.random() < error_rate:
+        raise error
+
+
+def _period_years(period):
+    """Converts a yfinance period such as "1y", "5y" or "6mo" to years (defaulting to 5)."""
+    match = re.fullmatch(r"(\d+)(y|mo|d)", period or "")
+    if not match:
+        return 5
+    value, unit = int(match.group(1)), match.group(2)
+    return {"y": value, "mo": value / 12, "d": value / TRADING_DAYS_PER_YEAR}[unit]
+
+
+class SyntheticTicker:
+    """Offline replacement for `yf.Ticker` serving deterministic per-ticker data."""
+
+    def __init__(self, ticker_symbol):
+        self.ticker_symbol = ticker_symbol.upper()
+
+    @property
+    def info(self):
+        simulate_request(SyntheticProviderError(f"Synthetic Yahoo Finance error for {self.ticker_symbol}."))
+        return generate_company_info(self.ticker_symbol)
+
+    def history(self, period="1mo", **kwargs):
+        simulate_request(SyntheticProviderError(f"Synthetic Yahoo Finance error for {self.ticker_symbol}."))
+        return generate_price_history(years=_period_years(period), seed=ticker_seed(self.ticker_symbol))
+
+
+class FakeAuthor:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeComment:
+    def __init__(self, body, score, author):
+        self.body = body
+        self.score = score
+        self.author = author
+
+
+class FakeCommentForest:
+    def __init__(self, comments):
+        self._comments = comments
+
+    def replace_more(self, limit=0):
+        return []
+
+    def list(self):
+        return list(self._comments)
+
+
+class FakeSubmission:
+    def __init__(self, title, selftext, score, url, created_utc, comments):
+        self.title = title
+        self.selftext = selftext
+        self.score = score
+        self.url = url
+        self.created_utc = created_utc
+        self.comments = FakeCommentForest(comments)
+
+
+def _phrase(rng, ticker_symbol):
+    phrases = [POSITIVE_PHRASES, NEGATIVE_PHRASES, NEUTRAL_PHRASES][rng.integers(0, 3)]
+    return f"{ticker_symbol} {phrases[rng.integers(0, len(phrases))]}"
+
+
+def generate_reddit_posts(ticker_symbol, n_posts=25, n_comments=10, seed=0, end="2025-01-01"):
+    """Generates `n_posts` submissions about the ticker, each with `n_comments` comments, spread over 30 days."""
+    rng = np.random.default_rng(seed)
+    end_ts = pd.Timestamp(end).timestamp()
+
+    posts = []
+    for i in range(n_posts):
+        comments = [
+            FakeComment(
+                _phrase(rng, ticker_symbol), int(rng.integers(-5, 200)), FakeAuthor(f"user{rng.integers(1000)}")
+            )
+            for _ in range(n_comments)
+        ]
+        posts.append(
+            FakeSubmission(
+                title=_phrase(rng, ticker_symbol),
+                selftext=_phrase(rng, ticker_symbol) if rng.random() < 0.5 else "",
+                score=int(rng.integers(0, 5000)),
+                url=f"https://reddit.example/{ticker_symbol.lower()}/{i}",
+                created_utc=end_ts - float(rng.uniform(0, 30 * 86400)),
+                comments=comments,
+            )
+        )
+    return posts
+
+
+class FakeSubreddit:
+    def __init__(self, n_posts, n_comments, seed):
+        self.n_posts = n_posts
+        self.n_comments = n_comments
+        self.seed = seed
+
+    def search(self, query, limit=None, sort=None, **kwargs):
+        simulate_request(PrawcoreException(f"Synthetic Reddit error for '{query}'."))
+        n_posts = self.n_posts if limit is None else min(limit, self.n_posts)
+        posts = generate_reddit_posts(query, n_posts, self.n_comments, seed=ticker_seed(query, self.seed))
+        if sort == "new":
+            posts.sort(key=lambda post: post.created_utc, reverse=True)
+        return iter(posts)
+
+
+class FakeReddit:
+    """Offline replacement for `praw.Reddit` that serves generated submissions from `subreddit(...).search`."""
+
+    read_only = True
+
+    def __init__(self, n_posts=25, n_comments=10, seed=0):
+        self.n_posts = n_posts
+        self.n_comments = n_comments
+        self.seed = seed
+
+    def subreddit(self, name):
+        return FakeSubreddit(self.n_posts, self.n_comments, self.seed)
@@ -1,15 +1,34 @@
 import datetime
 
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text, create_engine
+from sqlalchemy import Column, Date, DateTime, Float, Integer, String, Text, UniqueConstraint, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from .config import Config
 
+
+def engine_options(url):
+    """Returns the connection pool options for an engine. SQLite uses SQLAlchemy's default pool."""
+    if url.startswith("sqlite"):
+        return {}
+    return {"pool_size": Config.DB_POOL_SIZE, "max_overflow": Config.DB_MAX_OVERFLOW, "pool_pre_ping": True}
+
+
+def async_database_url(url):
+    """Converts a database URL to its asyncio driver, e.g. postgresql:// to postgresql+asyncpg://."""
+    drivers = {
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+        "sqlite": "sqlite+aiosqlite",
+    }
+    scheme, sep, rest = url.partition("://")
+    return f"{drivers.get(scheme, scheme)}{sep}{rest}"
+
+
 # Create a database engine using the URL from our configuration.
 # The engine is the central point of connection to the database.
 # It manages the connection pool and dialect for the specific database being used (PostgreSQL in this case).
-engine = create_engine(Config.DATABASE_URL)
+engine = create_engine(Config.DATABASE_URL, **engine_options(Config.DATABASE_URL))
 
 # Create a configured "Session" class. This class will be used to create new database sessions.
 # A session is a workspace for all the objects loaded or associated with it.
@@ -45,6 +64,47 @@ class AnalysisResult(Base):
     last_updated = Column(DateTime, default=datetime.datetime.utcnow)
 
 
+class BacktestPrediction(Base):
+    """SQLAlchemy model for the backtest_predictions table.
+
+    Each row is one model's one-step-ahead prediction for one trading day of a backtest. Later backtests
+    of the same ticker, model and configuration reuse the stored rows and only evaluate newer days.
+    """
+
+    __tablename__ = "backtest_predictions"
+    __table_args__ = (UniqueConstraint("ticker", "model", "config", "date", name="uq_backtest_prediction"),)
+
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    # The backtest settings the prediction was made with, e.g. "period=1y".
+    config = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    prediction = Column(Float, nullable=False)
+    actual = Column(Float, nullable=False)
+    error = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+class DailySentiment(Base):
+    """SQLAlchemy model for the daily_sentiment table.
+
+    Each row is the aggregated Reddit sentiment of one ticker on one (UTC) day, collected by the scheduled
+    sentiment job, so forecasts can use a sentiment history without calling Reddit.
+    """
+
+    __tablename__ = "daily_sentiment"
+    __table_args__ = (UniqueConstraint("ticker", "date", name="uq_daily_sentiment"),)
+
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    # The weighted VADER compound score of the day's posts and their top comments, from -1 to 1.
+    score = Column(Float, nullable=False)
+    posts = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
 def init_db():
     """Creates the database tables if they don't already exist.
 
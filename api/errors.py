@@ -10,3 +10,8 @@ def internal_error(message):
     response = jsonify({'error': 'internal server error', 'message': message})
     response.status_code = 500
     return response
+
+def not_found(message):
+    response = jsonify({'error': 'not found', 'message': message})
+    response.status_code = 404
+    return response
@@ -17,3 +17,15 @@ class AnalysisError(Exception):
     """Custom exception for errors that occur during the analysis process."""
 
     pass
+
+
+class StageTimeoutError(AnalysisError):
+    """Custom exception for an analysis stage that exceeded its hard time budget."""
+
+    pass
+
+
+class TaskCancelledError(Exception):
+    """Custom exception raised at a stage boundary when the task has been cancelled."""
+
+    pass
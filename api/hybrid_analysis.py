@@ -1,11 +1,107 @@
+import warnings
+
+import numpy as np
+
+from .analysis import simulation
+from .analysis.lstm_model import forecast_with_lstm  # noqa: F401
+from .analysis.sentiment import get_finbert_sentiment  # noqa: F401
+
+DEFAULT_WEIGHTS = {"arima": 0.4, "lstm": 0.4, "sentiment": 0.2}
+
+
+def model_shares(weights):
+    """
+    Returns the ARIMA and LSTM weights scaled to sum to 1, so the ensemble stays at the models' price level.
+    Sentiment is applied as a multiplier, not as a third term, so its weight is not part of the split.
+    """
+    arima_weight = np.asarray(weights["arima"], dtype=float)
+    lstm_weight = np.asarray(weights["lstm"], dtype=float)
+    total = arima_weight + lstm_weight
+    return arima_weight / total, lstm_weight / total
+
+
 def run_ensemble_prediction(arima_forecast, lstm_forecast, finbert_sentiment):
     """Combines predictions from multiple models using a weighted average."""
-    weights = {"arima": 0.4, "lstm": 0.4, "sentiment": 0.2}
+    weights = DEFAULT_WEIGHTS
+    arima_weight, lstm_weight = model_shares(weights)
 
     sentiment_adjustment = 1 + (finbert_sentiment * weights["sentiment"])
     adjusted_arima = arima_forecast * sentiment_adjustment
     adjusted_lstm = lstm_forecast * sentiment_adjustment
 
-    ensemble_forecast = (adjusted_arima * weights["arima"]) + (adjusted_lstm * weights["lstm"])
+    ensemble_forecast = (adjusted_arima * arima_weight) + (adjusted_lstm * lstm_weight)
 
     return ensemble_forecast
+
+
+def run_ensemble_prediction_with_bands(arima_forecast, lstm_forecast, finbert_sentiment, prices, n_paths=5000, seed=42):
+    """
+    Runs `run_ensemble_prediction` and adds Monte Carlo percentile bands around the ensemble forecast,
+    simulated by bootstrapping the historical daily returns in `prices`.
+    Returns `(ensemble_forecast, bands)`.
+    """
+    ensemble_forecast = run_ensemble_prediction(arima_forecast, lstm_forecast, finbert_sentiment)
+    paths = simulation.simulate_bootstrap_paths(
+        prices, point_forecast=np.asarray(ensemble_forecast, dtype=float), n_paths=n_paths, seed=seed
+    )
+    return ensemble_forecast, simulation.percentile_bands(paths)
+
+
+def run_batch_ensemble_prediction(arima_forecasts, lstm_forecasts, finbert_sentiments, weights=None):
+    """
+    Combines the forecasts of many tickers in one vectorized pass.
+
+    `arima_forecasts` and `lstm_forecasts` are `(tickers, horizon)` arrays and `finbert_sentiments` is a
+    `(tickers,)` vector. `weights` is either None (the default weights), a dict of scalars like
+    DEFAULT_WEIGHTS, or a dict of `(tickers,)` arrays such as the one returned by `fit_ensemble_weights`.
+    The ARIMA and LSTM weights are scaled to sum to 1 (see `model_shares`).
+    Returns a `(tickers, horizon)` array; row i equals `run_ensemble_prediction` on ticker i's inputs.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    arima_forecasts = np.asarray(arima_forecasts, dtype=float)
+    lstm_forecasts = np.asarray(lstm_forecasts, dtype=float)
+    if arima_forecasts.shape != lstm_forecasts.shape:
+        raise ValueError(
+            f"ARIMA and LSTM forecasts must have the same shape, got {arima_forecasts.shape} and {lstm_forecasts.shape}."
+        )
+
+    # Reshape the per-ticker vectors to (tickers, 1) so they broadcast along the horizon.
+    sentiments = np.asarray(finbert_sentiments, dtype=float).reshape(-1, 1)
+    arima_weight, lstm_weight = (share.reshape(-1, 1) for share in model_shares(weights))
+    sentiment_weight = np.asarray(weights["sentiment"], dtype=float).reshape(-1, 1)
+
+    sentiment_adjustment = 1 + sentiments * sentiment_weight
+    return (arima_forecasts * arima_weight + lstm_forecasts * lstm_weight) * sentiment_adjustment
+
+
+def fit_ensemble_weights(arima_errors, lstm_errors, sentiment_weight=DEFAULT_WEIGHTS["sentiment"]):
+    """
+    Fits per-ticker ensemble weights from backtest errors using inverse mean squared error weighting.
+
+    `arima_errors` and `lstm_errors` are `(tickers, days)` arrays of forecast errors (NaN for missing days).
+    The model with the lower error gets the larger share, and the ARIMA and LSTM weights sum to 1 like the
+    default weights do after `model_shares`. Tickers with no usable errors for either model fall back to the
+    default split.
+    Returns a dict of `(tickers,)` arrays that can be passed to `run_batch_ensemble_prediction`.
+    """
+    arima_errors = np.atleast_2d(np.asarray(arima_errors, dtype=float))
+    lstm_errors = np.atleast_2d(np.asarray(lstm_errors, dtype=float))
+
+    # All-NaN rows (no stored errors) produce NaN means, which are handled below.
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        arima_precision = 1 / np.nanmean(arima_errors**2, axis=1)
+        lstm_precision = 1 / np.nanmean(lstm_errors**2, axis=1)
+        arima_share = arima_precision / (arima_precision + lstm_precision)
+
+    default_share = model_shares(DEFAULT_WEIGHTS)[0]
+    # A perfect model (zero error) gets the whole share; undefined shares fall back to the default split.
+    arima_share = np.where(np.isposinf(arima_precision) & ~np.isposinf(lstm_precision), 1.0, arima_share)
+    arima_share = np.where(np.isposinf(lstm_precision) & ~np.isposinf(arima_precision), 0.0, arima_share)
+    arima_share = np.where(np.isfinite(arima_share), arima_share, default_share)
+
+    return {
+        "arima": arima_share,
+        "lstm": 1 - arima_share,
+        "sentiment": np.full(arima_share.shape, sentiment_weight),
+    }
@@ -0,0 +1,125 @@
+"""
+Prometheus instrumentation for the analysis pipeline.
+
+Stage timings, cache hits and misses, Celery queue wait times and task outcomes are recorded here and exported
+on the Flask `/metrics` endpoint. When `PROMETHEUS_MULTIPROC_DIR` is set (it must be the same directory for the
+Flask server and every Celery worker on the host), each process writes its samples there and the endpoint
+aggregates them, so metrics recorded in worker processes are visible from the web process.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_process_shutdown
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+STAGE_SECONDS = Histogram(
+    "prestocked_stage_seconds", "Time spent in each analysis pipeline stage.", ["stage"], buckets=STAGE_BUCKETS
+)
+CACHE_REQUESTS = Counter("prestocked_cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"])
+QUEUE_WAIT_SECONDS = Histogram(
+    "prestocked_task_queue_wait_seconds",
+    "Time between a task being published and a worker starting it.",
+    ["task"],
+    buckets=STAGE_BUCKETS,
+)
+TASK_OUTCOMES = Counter("prestocked_task_outcomes_total", "Finished Celery tasks by outcome.", ["task", "outcome"])
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "prestocked_rate_limit_wait_seconds",
+    "Time spent waiting for a data provider rate limit token.",
+    ["provider"],
+    buckets=(0, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+THROTTLED_REQUESTS = Counter(
+    "prestocked_throttled_requests_total", "Data provider requests rejected as too many requests.", ["provider"]
+)
+STAGE_BUDGET_EXCEEDED = Counter(
+    "prestocked_stage_budget_exceeded_total", "Analysis stages that ran past their time budget.", ["stage", "budget"]
+)
+DEGRADED_STAGES = Counter(
+    "prestocked_degraded_stages_total", "Analysis stages that fell back to a cheaper result.", ["stage"]
+)
+
+
+@contextmanager
+def stage_timer(stage):
+    """Context manager that records the duration of a pipeline stage, whether it succeeds or fails."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def timed(stage):
+    """Decorator form of `stage_timer`."""
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            with stage_timer(stage):
+                return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def _short_task_name(name):
+    return name.rsplit(".", 1)[-1] if name else "unknown"
+
+
+@before_task_publish.connect
+def stamp_publish_time(headers=None, **kwargs):
+    """Adds the publish time to the message headers so the worker can measure queue wait time."""
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+@task_prerun.connect
+def observe_queue_wait(task=None, **kwargs):
+    published_at = task.request.get("published_at") if task is not None else None
+    if published_at:
+        QUEUE_WAIT_SECONDS.labels(task=_short_task_name(task.name)).observe(max(0.0, time.time() - published_at))
+
+
+@task_postrun.connect
+def count_task_outcome(task=None, retval=None, state=None, **kwargs):
+    # The analysis tasks report handled failures in their return value rather than by raising.
+    if isinstance(retval, dict) and "status" in retval:
+        outcome = retval["status"]
+    elif state == "IGNORED":
+        # Cancelled analyses raise Ignore so that their REVOKED state is kept.
+        outcome = "cancelled"
+    else:
+        outcome = (state or "unknown").lower()
+    TASK_OUTCOMES.labels(task=_short_task_name(task.name if task is not None else None), outcome=outcome).inc()
+
+
+@worker_process_shutdown.connect
+def mark_worker_process_dead(pid=None, **kwargs):
+    """Removes the live-gauge files of a recycled worker child in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def metrics_payload():
+    """Returns the `(body, content_type)` of the metrics exposition, aggregated across processes if configured."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
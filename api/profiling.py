@@ -0,0 +1,183 @@
+"""
+Opt-in profiling of individual Celery tasks.
+
+A task is profiled when it is sent with the `profile` message header (the API sets it when a request has
+`profile=1`) or when it is picked by `PROFILE_SAMPLE_RATE`. Its cProfile stats and a tracemalloc allocation
+snapshot are saved under `PROFILE_DIR/<task_id>/`. When a task is not selected it runs unwrapped, so
+profiling costs nothing when it is off.
+
+Usage:
+    python -m api.profiling list
+    python -m api.profiling show <task_id> [--limit 20]
+"""
+
+import argparse
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+from .config import Config
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+PROFILE_FILE = "profile.prof"
+SNAPSHOT_FILE = "allocations.snapshot"
+META_FILE = "meta.json"
+
+_TASK_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def get_request_header(request, name):
+    """
+    Reads a custom message header from a task request. A worker exposes custom headers as request
+    attributes, while eager execution nests them under `request.headers`.
+    """
+    value = request.get(name)
+    if value is None:
+        value = (request.get("headers") or {}).get(name)
+    return value
+
+
+def should_profile(request):
+    """Decides whether a task request is profiled, from its `profile` header or the configured sample rate."""
+    if get_request_header(request, "profile"):
+        return True
+    return Config.PROFILE_SAMPLE_RATE > 0 and random.random() < Config.PROFILE_SAMPLE_RATE
+
+
+def _profile_path(task_id, filename=None):
+    if not task_id or not _TASK_ID_PATTERN.match(task_id):
+        raise ValueError(f"Invalid task id '{task_id}'.")
+    path = os.path.join(Config.PROFILE_DIR, task_id)
+    return os.path.join(path, filename) if filename else path
+
+
+@contextmanager
+def capture(task_id, task_name, args=()):
+    """Profiles the enclosed block and saves the stats, allocation snapshot and metadata for `task_id`."""
+    directory = _profile_path(task_id)
+    os.makedirs(directory, exist_ok=True)
+
+    profiler = cProfile.Profile()
+    started_at = time.time()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(os.path.join(directory, PROFILE_FILE))
+        snapshot.dump(os.path.join(directory, SNAPSHOT_FILE))
+        with open(os.path.join(directory, META_FILE), "w") as f:
+            json.dump(
+                {
+                    "task_id": task_id,
+                    "task": task_name,
+                    "args": [str(arg) for arg in args],
+                    "started_at": started_at,
+                    "duration": time.time() - started_at,
+                    "peak_memory_mb": peak / 1024**2,
+                },
+                f,
+            )
+        logging.info(f"Saved profile of task {task_id} to {directory}.")
+
+
+def profile_task(f):
+    """Decorator for bound Celery tasks that profiles the run when `should_profile` selects it."""
+
+    @wraps(f)
+    def decorated_function(self, *args, **kwargs):
+        if not should_profile(self.request):
+            return f(self, *args, **kwargs)
+        with capture(self.request.id, self.name, args):
+            return f(self, *args, **kwargs)
+
+    return decorated_function
+
+
+def list_profiles():
+    """Returns the metadata of every saved profile, most recent first."""
+    if not os.path.isdir(Config.PROFILE_DIR):
+        return []
+
+    profiles = []
+    for task_id in os.listdir(Config.PROFILE_DIR):
+        meta_path = os.path.join(Config.PROFILE_DIR, task_id, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                profiles.append(json.load(f))
+    return sorted(profiles, key=lambda meta: meta["started_at"], reverse=True)
+
+
+def summarize_profile(task_id, limit=20):
+    """
+    Summarizes a saved profile: the top functions by cumulative time and the source lines that allocated
+    the most memory. Raises FileNotFoundError if no profile exists for the task.
+    """
+    with open(_profile_path(task_id, META_FILE)) as f:
+        meta = json.load(f)
+
+    stats = pstats.Stats(_profile_path(task_id, PROFILE_FILE))
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    functions = [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_time": total_time,
+            "cumulative_time": cumulative_time,
+        }
+        for (filename, line, name), (_, calls, total_time, cumulative_time, _) in rows
+    ]
+
+    snapshot = tracemalloc.Snapshot.load(_profile_path(task_id, SNAPSHOT_FILE))
+    allocations = [
+        {"location": str(stat.traceback), "size_kb": stat.size / 1024, "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+    return {**meta, "functions": functions, "allocations": allocations}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List and summarize saved task profiles.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list")
+    show = subparsers.add_parser("show")
+    show.add_argument("task_id")
+    show.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for meta in list_profiles():
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(meta["started_at"]))
+            print(f"{meta['task_id']}  {started}  {meta['duration']:8.2f} s  {meta['task']} {' '.join(meta['args'])}")
+        return
+
+    summary = summarize_profile(args.task_id, args.limit)
+    print(
+        f"{summary['task']} {' '.join(summary['args'])}: {summary['duration']:.2f} s, "
+        f"peak {summary['peak_memory_mb']:.1f} MB traced"
+    )
+    print(f"\n{'cumulative':>12} {'total':>10} {'calls':>8}  function")
+    for row in summary["functions"]:
+        print(f"{row['cumulative_time']:12.4f} {row['total_time']:10.4f} {row['calls']:8d}  {row['function']}")
+    print(f"\n{'size (KB)':>12} {'count':>8}  location")
+    for row in summary["allocations"]:
+        print(f"{row['size_kb']:12.1f} {row['count']:8d}  {row['location']}")
+
+
+if __name__ == "__main__":
+    main()
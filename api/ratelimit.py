@@ -0,0 +1,158 @@
+"""
+Rate limiting and throttling backoff for calls to external data providers.
+
+All worker processes share one token bucket per provider in Redis, so the combined request rate to Yahoo
+Finance or Reddit stays within its budget however many workers are running. Each call reserves a token
+atomically (a Lua script, using the Redis server clock) and sleeps until its reservation is due. If a
+provider still throttles a request, the call is retried with jittered exponential backoff.
+Without a Redis URL (e.g. with the in-memory broker used for offline runs), an in-process bucket is used.
+"""
+
+import logging
+import random
+import threading
+import time
+
+from .config import Config
+from .metrics import RATE_LIMIT_WAIT_SECONDS, THROTTLED_REQUESTS
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Reserves one token and returns the seconds to wait before using it. The bucket may go negative:
+# that is the queue of reservations waiting for refills.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+if tokens >= 0 then
+  return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+def parse_rate_limits(value):
+    """
+    Parses a rate limit specification such as "yahoo=2:5;reddit=1:3" into a mapping of provider to
+    `(requests per second, burst capacity)`.
+    """
+    limits = {}
+    for entry in (value or "").split(";"):
+        if not entry.strip():
+            continue
+        provider, _, limit = entry.partition("=")
+        rate, _, capacity = limit.partition(":")
+        limits[provider.strip()] = (float(rate), float(capacity or rate))
+    return limits
+
+
+class RedisTokenBucket:
+    """Token buckets shared by every process that uses the same Redis server."""
+
+    def __init__(self, client, prefix="prestocked:ratelimit:"):
+        self.prefix = prefix
+        self.script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def reserve(self, provider, rate, capacity):
+        return float(self.script(keys=[self.prefix + provider], args=[rate, capacity]))
+
+
+class LocalTokenBucket:
+    """In-process token buckets with the same semantics, for single-process and offline runs."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.state = {}
+
+    def reserve(self, provider, rate, capacity):
+        with self.lock:
+            now = self.clock()
+            tokens, ts = self.state.get(provider, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate) - 1
+            self.state[provider] = (tokens, now)
+        return 0.0 if tokens >= 0 else -tokens / rate
+
+
+class RateLimiter:
+    def __init__(self, bucket, limits, sleep=time.sleep):
+        self.bucket = bucket
+        self.limits = limits
+        self.sleep = sleep
+
+    def acquire(self, provider):
+        """Blocks until the provider's budget allows another request. Returns the time waited."""
+        if provider not in self.limits:
+            return 0.0
+        rate, capacity = self.limits[provider]
+        try:
+            wait = self.bucket.reserve(provider, rate, capacity)
+        except Exception as e:
+            # The limiter protects the provider; it must not take the pipeline down with it.
+            logging.warning(f"Rate limiter unavailable, calling {provider} without a token: {e}")
+            wait = 0.0
+        RATE_LIMIT_WAIT_SECONDS.labels(provider=provider).observe(wait)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+_limiter = None
+
+
+def get_limiter():
+    """Returns the process-wide limiter, backed by Redis when RATE_LIMIT_REDIS_URL is a Redis URL."""
+    global _limiter
+    if _limiter is None:
+        limits = parse_rate_limits(Config.RATE_LIMITS)
+        if Config.RATE_LIMIT_REDIS_URL.startswith(("redis://", "rediss://", "unix://")):
+            import redis
+
+            bucket = RedisTokenBucket(redis.Redis.from_url(Config.RATE_LIMIT_REDIS_URL))
+        else:
+            bucket = LocalTokenBucket()
+        _limiter = RateLimiter(bucket, limits)
+    return _limiter
+
+
+def is_throttled(exc):
+    """Returns True if the exception is a provider's "too many requests" response."""
+    if type(exc).__name__ in ("YFRateLimitError", "TooManyRequests", "SyntheticRateLimitError"):
+        return True
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429 or "Too Many Requests" in str(exc)
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """Full-jitter exponential backoff: a uniform delay up to `base * 2**attempt`, capped at `cap`."""
+    base = Config.RATE_LIMIT_BACKOFF_BASE if base is None else base
+    cap = Config.RATE_LIMIT_BACKOFF_CAP if cap is None else cap
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def call_with_backoff(provider, fn, *args, retries=None, limiter=None, sleep=time.sleep, **kwargs):
+    """
+    Calls `fn(*args, **kwargs)` once the provider's rate limit allows it, retrying throttled calls with
+    jittered exponential backoff. Other exceptions, and a throttled final attempt, are raised unchanged.
+    """
+    retries = Config.RATE_LIMIT_RETRIES if retries is None else retries
+    limiter = limiter or get_limiter()
+
+    for attempt in range(retries + 1):
+        limiter.acquire(provider)
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if not is_throttled(e) or attempt == retries:
+                raise
+            THROTTLED_REQUESTS.labels(provider=provider).inc()
+            delay = backoff_delay(attempt)
+            logging.warning(f"{provider} throttled the request (attempt {attempt + 1}); retrying in {delay:.2f}s.")
+            sleep(delay)
@@ -1,98 +1,291 @@
+import datetime
+import json
+import logging
+
 from celery import Celery
+from celery.exceptions import Ignore, SoftTimeLimitExceeded
+from celery.schedules import crontab
 
-from . import analysis_engine, hybrid_analysis
+from . import analysis_engine, hybrid_analysis, worker
+from .analysis import global_lstm
+from .analysis.arima_model import FORECAST_SENTIMENT_DAYS
 from .analysis.backtesting import run_backtesting
+from .budgets import mark_degraded, stage_budget
 from .config import Config
-from .database import db_session
-from .exceptions import AnalysisError, RedditAPIError, StockDataError
+from .data import sentiment_store
+from .database import AnalysisResult, db_session
+from .exceptions import AnalysisError, RedditAPIError, StageTimeoutError, StockDataError, TaskCancelledError
+from .metrics import stage_timer
+from .profiling import profile_task
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Prefix of the result backend keys that flag a task as cancelled.
+CANCEL_KEY_PREFIX = "prestocked-cancel-"
 
 # Create a Celery application instance.
 # We configure it with the broker and backend URLs from our config file.
 celery_app = Celery(__name__, broker=Config.CELERY_BROKER_URL, backend=Config.CELERY_RESULT_BACKEND)
+# Recycle worker children after a number of tasks or once they exceed a memory limit.
+# Models preloaded in the parent (see api/worker.py) are inherited again by the replacement child.
+celery_app.conf.update(worker.worker_settings())
+# Eager mode runs tasks inside the calling process; results are still stored so /status works.
+celery_app.conf.update(task_always_eager=Config.CELERY_TASK_ALWAYS_EAGER, task_store_eager_result=True)
+# Celery beat collects daily Reddit sentiment when the analyses read it from the database and, in global LSTM
+# mode, retrains the global model daily.
+celery_app.conf.beat_schedule = {}
+if Config.SENTIMENT_SOURCE == "stored":
+    celery_app.conf.beat_schedule["update-daily-sentiment"] = {
+        "task": "api.tasks.update_daily_sentiment_task",
+        "schedule": datetime.timedelta(minutes=Config.SENTIMENT_UPDATE_MINUTES),
+    }
+if Config.LSTM_MODE == "global":
+    celery_app.conf.beat_schedule["train-global-lstm"] = {
+        "task": "api.tasks.train_global_lstm_task",
+        "schedule": crontab(hour=Config.GLOBAL_LSTM_TRAIN_HOUR, minute=0),
+    }
 
 
-@celery_app.task(bind=True)
+def report_failure(task, exc, state="FAILURE"):
+    """
+    Marks the task as failed (or, with state="REVOKED", as cancelled). Celery decodes the metadata of both
+    states as a serialized exception, so the error is stored in the result backend's exception format.
+    """
+    task.update_state(state=state, meta=task.backend.prepare_exception(exc))
+
+
+def cancel_task(task_id):
+    """
+    Cancels a task. Revoking it makes the workers discard it if it has not started yet, and the cancel flag,
+    stored in the result backend so every worker sees it, stops a running analysis at its next stage boundary.
+    """
+    celery_app.control.revoke(task_id)
+    celery_app.backend.set(CANCEL_KEY_PREFIX + task_id, "1")
+
+
+def is_cancelled(task_id):
+    return task_id is not None and celery_app.backend.get(CANCEL_KEY_PREFIX + task_id) is not None
+
+
+def start_stage(task, status):
+    """Starts a stage of a task: stops the task if it has been cancelled, otherwise reports the stage as progress."""
+    if is_cancelled(task.request.id):
+        raise TaskCancelledError("The analysis was cancelled.")
+    task.update_state(state="PROGRESS", meta={"status": status})
+
+
+def completed(ticker_symbol, degraded_stages):
+    """The return value of a finished analysis. It is partial if any stage fell back to a cheaper result."""
+    return {
+        "status": "complete",
+        "ticker": ticker_symbol,
+        "result": {"partial": bool(degraded_stages), "degraded_stages": degraded_stages},
+    }
+
+
+def save_analysis_result(ticker_symbol, **fields):
+    """Creates or updates the cached analysis result of a ticker and refreshes its timestamp."""
+    with stage_timer("db_write"):
+        result = AnalysisResult.query.filter(AnalysisResult.ticker == ticker_symbol).first()
+        if result is None:
+            result = AnalysisResult(ticker=ticker_symbol)
+            db_session.add(result)
+        for name, value in fields.items():
+            setattr(result, name, value)
+        result.last_updated = datetime.datetime.utcnow()
+        db_session.commit()
+
+
+def skip_sentiment(ticker_symbol, error, degraded_stages):
+    """Sentiment is optional: when it runs out of time the forecast is kept without it and marked partial."""
+    logging.warning(f"Skipping the sentiment of {ticker_symbol}: {error}")
+    mark_degraded("sentiment")
+    degraded_stages.append("sentiment")
+
+
+@celery_app.task(bind=True, soft_time_limit=Config.ANALYSIS_SOFT_TIME_LIMIT, time_limit=Config.ANALYSIS_TIME_LIMIT)
+@profile_task
 def run_full_analysis(self, ticker_symbol):
     """Celery task to run the full stock analysis..."""
     db_session()
+    degraded_stages = []
     try:
-        # ... (analysis steps)
-        self.update_state(state="PROGRESS", meta={"status": "Fetching stock data..."})
-        _info, hist = analysis_engine.get_stock_data(ticker_symbol)
+        start_stage(self, "Fetching stock data...")
+        with stage_budget("fetch"):
+            _info, hist = analysis_engine.get_stock_data(ticker_symbol)
 
-        self.update_state(state="PROGRESS", meta={"status": "Calculating technical indicators..."})
+        start_stage(self, "Calculating technical indicators...")
         hist = analysis_engine.calculate_technical_indicators(hist)
 
-        self.update_state(state="PROGRESS", meta={"status": "Generating ARIMA forecast..."})
-        _forecast, _forecast_dates = analysis_engine.forecast_stock_price(hist)
+        if Config.SENTIMENT_SOURCE == "stored":
+            # Sentiment enters the ARIMAX model from the stored daily history; no Reddit call is made.
+            start_stage(self, "Generating ARIMAX forecast...")
+            daily_sentiment = sentiment_store.load_daily_sentiment(ticker_symbol, start_date=hist.index[0].date())
+            with stage_budget("arima") as budget:
+                adjusted_forecast, forecast_dates, bands = analysis_engine.forecast_stock_price_with_bands(
+                    hist, sentiment=daily_sentiment, deadline=budget.soft_deadline
+                )
+            sentiment = float(daily_sentiment.iloc[-FORECAST_SENTIMENT_DAYS:].mean()) if len(daily_sentiment) else 0.0
+            posts = []
+        else:
+            start_stage(self, "Generating ARIMA forecast...")
+            with stage_budget("arima") as budget:
+                forecast, forecast_dates, bands = analysis_engine.forecast_stock_price_with_bands(
+                    hist, deadline=budget.soft_deadline
+                )
 
-        # ... (database update)
+            start_stage(self, "Analyzing Reddit sentiment...")
+            try:
+                with stage_budget("sentiment"):
+                    sentiment, posts, _ = analysis_engine.get_reddit_sentiment(ticker_symbol)
+            except StageTimeoutError as e:
+                skip_sentiment(ticker_symbol, e, degraded_stages)
+                sentiment, posts = 0.0, []
 
-        self.update_state(state="PROGRESS", meta={"status": "Analyzing Reddit sentiment..."})
-        _sentiment, _posts, _ = analysis_engine.get_reddit_sentiment(ticker_symbol)
+            # Apply the same sentiment adjustment as the hybrid ensemble, to the forecast and its bands.
+            sentiment_adjustment = 1 + sentiment * hybrid_analysis.DEFAULT_WEIGHTS["sentiment"]
+            adjusted_forecast = forecast * sentiment_adjustment
+            bands = {percentile: band * sentiment_adjustment for percentile, band in bands.items()}
+        if budget.degraded:
+            degraded_stages.insert(0, "arima")
 
-        # ... (sentiment adjustment and final plot)
+        start_stage(self, "Creating the plot...")
+        plot = analysis_engine.create_plot(hist, adjusted_forecast, forecast_dates, ticker_symbol, bands=bands)
 
-        return {"status": "complete", "ticker": ticker_symbol}
+        save_analysis_result(ticker_symbol, arima_plot=plot, sentiment=sentiment, sentiment_posts=json.dumps(posts))
+
+        return completed(ticker_symbol, degraded_stages)
+    except TaskCancelledError as e:
+        report_failure(self, e, state="REVOKED")
+        # Ignore keeps the REVOKED state instead of storing the return value as SUCCESS.
+        raise Ignore() from e
+    except SoftTimeLimitExceeded:
+        report_failure(self, StageTimeoutError("The analysis exceeded its time limit."))
+        return {"status": "failure", "error": "The analysis exceeded its time limit."}
     except (StockDataError, RedditAPIError, AnalysisError) as e:
-        self.update_state(state="FAILURE", meta={"status": str(e)})
+        report_failure(self, e)
         return {"status": "failure", "error": str(e)}
     except Exception:
         # Catch any other unexpected errors
-        self.update_state(state="FAILURE", meta={"status": "An unexpected error occurred."})
+        report_failure(self, AnalysisError("An unexpected error occurred."))
         return {"status": "failure", "error": "An unexpected error occurred."}
     finally:
         db_session.remove()
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, soft_time_limit=Config.ANALYSIS_SOFT_TIME_LIMIT, time_limit=Config.ANALYSIS_TIME_LIMIT)
+@profile_task
 def run_hybrid_analysis_task(self, ticker_symbol):
     """Celery task to run the hybrid stock analysis..."""
     db_session()
+    degraded_stages = []
     try:
-        # ... (analysis steps)
-        self.update_state(state="PROGRESS", meta={"status": "Fetching stock data..."})
-        _info, hist = analysis_engine.get_stock_data(ticker_symbol)
+        start_stage(self, "Fetching stock data...")
+        with stage_budget("fetch"):
+            _info, hist = analysis_engine.get_stock_data(ticker_symbol)
+        hist = analysis_engine.calculate_technical_indicators(hist)
 
-        self.update_state(state="PROGRESS", meta={"status": "Generating ARIMA forecast..."})
-        _arima_forecast, _forecast_dates = analysis_engine.forecast_stock_price(hist)
+        start_stage(self, "Generating ARIMA forecast...")
+        with stage_budget("arima") as budget:
+            arima_forecast, forecast_dates = analysis_engine.forecast_stock_price(hist, deadline=budget.soft_deadline)
+        if budget.degraded:
+            degraded_stages.append("arima")
 
-        self.update_state(state="PROGRESS", meta={"status": "Generating LSTM forecast..."})
-        hybrid_analysis.forecast_with_lstm(hist)
+        start_stage(self, "Generating LSTM forecast...")
+        with stage_budget("lstm"):
+            lstm_forecast = hybrid_analysis.forecast_with_lstm(hist)
 
-        self.update_state(state="PROGRESS", meta={"status": "Analyzing FinBERT sentiment..."})
-        _, _posts, _ = analysis_engine.get_reddit_sentiment(ticker_symbol)
-        hybrid_analysis.get_finbert_sentiment(_posts)
+        start_stage(self, "Analyzing FinBERT sentiment...")
+        try:
+            with stage_budget("sentiment"):
+                _, posts, _ = analysis_engine.get_reddit_sentiment(ticker_symbol)
+                finbert_sentiment = hybrid_analysis.get_finbert_sentiment(posts)
+        except StageTimeoutError as e:
+            skip_sentiment(ticker_symbol, e, degraded_stages)
+            finbert_sentiment = 0.0
 
-        # ... (ensemble prediction and plot)
+        start_stage(self, "Creating the plot...")
+        ensemble_forecast, bands = hybrid_analysis.run_ensemble_prediction_with_bands(
+            arima_forecast.to_numpy(), lstm_forecast, finbert_sentiment, hist["Close"].to_numpy()
+        )
+        plot = analysis_engine.create_plot(hist, ensemble_forecast, forecast_dates, ticker_symbol, bands=bands)
 
-        return {"status": "complete", "ticker": ticker_symbol}
+        save_analysis_result(ticker_symbol, hybrid_plot=plot)
+
+        return completed(ticker_symbol, degraded_stages)
+    except TaskCancelledError as e:
+        report_failure(self, e, state="REVOKED")
+        # Ignore keeps the REVOKED state instead of storing the return value as SUCCESS.
+        raise Ignore() from e
+    except SoftTimeLimitExceeded:
+        report_failure(self, StageTimeoutError("The hybrid analysis exceeded its time limit."))
+        return {"status": "failure", "error": "The hybrid analysis exceeded its time limit."}
     except (StockDataError, RedditAPIError, AnalysisError) as e:
-        self.update_state(state="FAILURE", meta={"status": str(e)})
+        report_failure(self, e)
         return {"status": "failure", "error": str(e)}
     except Exception:
         # Catch any other unexpected errors
-        self.update_state(state="FAILURE", meta={"status": "An unexpected error occurred during hybrid analysis."})
+        report_failure(self, AnalysisError("An unexpected error occurred during hybrid analysis."))
         return {"status": "failure", "error": "An unexpected error occurred during hybrid analysis."}
     finally:
         db_session.remove()
 
 
 @celery_app.task(bind=True)
+@profile_task
 def run_backtesting_task(self, ticker_symbol):
     """Celery task to run the backtesting of the models."""
     db_session()
     try:
-        self.update_state(state="PROGRESS", meta={"status": "Starting backtesting..."})
-        results = run_backtesting(ticker_symbol)
+        start_stage(self, "Starting backtesting...")
+        results = run_backtesting(ticker_symbol, on_step=lambda status: start_stage(self, status))
         self.update_state(state="SUCCESS", meta={"status": "Backtesting complete.", "result": results})
         return {"status": "complete", "ticker": ticker_symbol, "result": results}
+    except TaskCancelledError as e:
+        report_failure(self, e, state="REVOKED")
+        # Ignore keeps the REVOKED state instead of storing the return value as SUCCESS.
+        raise Ignore() from e
     except (StockDataError, AnalysisError) as e:
-        self.update_state(state="FAILURE", meta={"status": str(e)})
+        report_failure(self, e)
         return {"status": "failure", "error": str(e)}
     except Exception:
         # Catch any other unexpected errors
-        self.update_state(state="FAILURE", meta={"status": "An unexpected error occurred during backtesting."})
+        report_failure(self, AnalysisError("An unexpected error occurred during backtesting."))
         return {"status": "failure", "error": "An unexpected error occurred during backtesting."}
     finally:
         db_session.remove()
+
+
+@celery_app.task(bind=True)
+@profile_task
+def train_global_lstm_task(self):
+    """Celery task to retrain the global LSTM on GLOBAL_LSTM_TICKERS."""
+    try:
+        self.update_state(state="PROGRESS", meta={"status": "Training the global LSTM..."})
+        _, meta = global_lstm.train_from_tickers(Config.GLOBAL_LSTM_TICKERS)
+        return {"status": "complete", **meta}
+    except AnalysisError as e:
+        report_failure(self, e)
+        return {"status": "failure", "error": str(e)}
+    except Exception:
+        report_failure(self, AnalysisError("An unexpected error occurred while training the global LSTM."))
+        return {"status": "failure", "error": "An unexpected error occurred while training the global LSTM."}
+
+
+@celery_app.task(bind=True)
+@profile_task
+def update_daily_sentiment_task(self):
+    """Celery task to store the latest daily Reddit sentiment of every tracked ticker."""
+    db_session()
+    try:
+        updated = {}
+        for ticker_symbol in sentiment_store.tracked_tickers(Config.SENTIMENT_TICKERS):
+            try:
+                updated[ticker_symbol] = sentiment_store.update_daily_sentiment(ticker_symbol)
+            except RedditAPIError as e:
+                # One ticker failing should not stop the others; it is retried on the next run.
+                db_session.rollback()
+                logging.warning(f"Could not update daily sentiment for {ticker_symbol}: {e}")
+        return {"status": "complete", "updated_days": updated}
+    finally:
+        db_session.remove()
@@ -5,6 +5,13 @@ from flask import request
 from .errors import bad_request
 
 
+def task_options():
+    """Returns extra `apply_async` options for the current request, e.g. the header that enables profiling."""
+    if request.form.get("profile", "").lower() in ("1", "true", "yes"):
+        return {"headers": {"profile": True}}
+    return {}
+
+
 def validate_ticker(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -13,3 +20,27 @@ def validate_ticker(f):
             return bad_request("Invalid ticker symbol.")
         return f(*args, **kwargs)
     return decorated_function
+
+
+def status_payload(state, info):
+    """Builds the `/status` response from a task's state and info (its progress meta, result or exception)."""
+    if state == "PENDING":
+        return {"state": state, "status": "Pending..."}
+    if state not in ("FAILURE", "REVOKED"):
+        response = {"state": state, "status": info.get("status", "")}
+        if "result" in info:
+            response["result"] = info["result"]
+        return response
+    return {"state": state, "status": str(info)}
+
+
+def analysis_payload(arima_plot, sentiment, sentiment_posts):
+    """Builds the `/data` response from the stored analysis columns."""
+    if arima_plot:
+        return {"arima_plot": arima_plot, "sentiment": sentiment, "posts": sentiment_posts}
+    return {"arima_plot": None, "sentiment": None, "posts": None}
+
+
+def hybrid_payload(hybrid_plot):
+    """Builds the `/hybrid_data` response from the stored hybrid plot."""
+    return {"hybrid_plot": hybrid_plot or None}
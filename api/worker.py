@@ -0,0 +1,108 @@
+"""Celery worker bootstrap: model preloading and child recycling.
+
+With the prefork pool, anything loaded in the parent process before the pool starts is inherited by
+every child and shared through copy-on-write. Loading FinBERT and TensorFlow here means children start
+warm and do not each hold a private copy of the weights.
+"""
+
+import gc
+import logging
+
+from celery.signals import worker_init
+
+from .config import Config
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def parse_preload_config(value):
+    """
+    Parses a preload specification such as "celery=finbert,lstm;backtest=lstm"
+    into a mapping of queue name to the list of models it preloads.
+    """
+    preload = {}
+    if not value:
+        return preload
+
+    for entry in value.split(";"):
+        if not entry.strip():
+            continue
+        queue, _, models = entry.partition("=")
+        preload[queue.strip()] = [model.strip() for model in models.split(",") if model.strip()]
+    return preload
+
+
+def _preload_finbert():
+    """Loads the FinBERT pipeline and runs it once so lazy initialisation happens in the parent."""
+    from .analysis import sentiment
+
+    sentiment.get_finbert()(["Warming up the FinBERT pipeline."])
+
+
+def _preload_lstm():
+    """
+    Imports TensorFlow and Keras, which accounts for most of the LSTM cold start.
+    No model is built or loaded here, since the TensorFlow runtime must not start its thread pools before
+    the fork: per-ticker models are trained per request, and the global model (LSTM_MODE=global) is loaded
+    by each child on its first forecast.
+    """
+    from .analysis import lstm_model  # noqa: F401
+
+
+PRELOADERS = {
+    "finbert": _preload_finbert,
+    "lstm": _preload_lstm,
+}
+
+
+def preload_models(models):
+    """
+    Preloads the given models and freezes the garbage collector so the shared pages are not
+    dirtied by reference-count scans in the children. Returns the names of the models loaded.
+    """
+    loaded = []
+    for name in models:
+        preloader = PRELOADERS.get(name)
+        if preloader is None:
+            logging.warning(f"Unknown model '{name}' in WORKER_PRELOAD_MODELS, skipping.")
+            continue
+        try:
+            preloader()
+            loaded.append(name)
+        except Exception as e:
+            # A failed preload is not fatal: the child will load the model lazily on first use.
+            logging.error(f"Failed to preload model '{name}': {e}")
+
+    if loaded:
+        gc.freeze()
+    return loaded
+
+
+def models_for_queues(queues, preload_config):
+    """Returns the de-duplicated list of models to preload for the queues a worker consumes from."""
+    models = []
+    for queue in queues:
+        for model in preload_config.get(queue, []):
+            if model not in models:
+                models.append(model)
+    return models
+
+
+@worker_init.connect
+def preload_on_worker_init(sender=None, **kwargs):
+    """Preloads the configured models in the worker parent, before the pool forks its children."""
+    if sender is None:
+        return
+    queues = list(sender.app.amqp.queues.consume_from)
+    models = models_for_queues(queues, parse_preload_config(Config.WORKER_PRELOAD_MODELS))
+    if models:
+        logging.info(f"Preloading models {models} for queues {queues}.")
+        preload_models(models)
+
+
+def worker_settings():
+    """Returns the Celery settings that bound the memory footprint of each worker child."""
+    return {
+        "worker_max_tasks_per_child": Config.WORKER_MAX_TASKS_PER_CHILD or None,
+        "worker_max_memory_per_child": Config.WORKER_MAX_MEMORY_PER_CHILD or None,
+    }
@@ -0,0 +1,212 @@
+"""
+End-to-end load test of the Flask + Celery pipeline against local stand-ins for Yahoo Finance and Reddit.
+
+By default the app runs in-process: the Flask test client serves the requests, Celery tasks run eagerly in
+the request thread with an in-memory broker and result backend, and the synthetic data providers replace
+the network calls. With `--url` the requests go over HTTP to a running server instead; start it and its
+workers with `DATA_PROVIDER=synthetic` so they do not hit Yahoo Finance or Reddit, and worker utilization
+is then sampled through Celery's inspect API.
+
+Usage:
+    DATABASE_URL=sqlite:///loadtest.db python -m benchmarks.loadtest --requests 200 --concurrency 16
+    python -m benchmarks.loadtest --url http://127.0.0.1:5000 --requests 1000 --concurrency 64
+
+The report shows throughput, p50/p95/p99 latency per endpoint and worker utilization.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import string
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = ("analyze", "hybrid_analyze", "status")
+
+
+def configure_in_process(latency_ms, error_rate, throttle_rate=0.0):
+    """Sets the environment for an in-process run; must be called before `api` is imported."""
+    os.environ.setdefault("DATABASE_URL", "sqlite:///loadtest.db")
+    os.environ["DATA_PROVIDER"] = "synthetic"
+    os.environ["SYNTHETIC_LATENCY_MS"] = str(latency_ms)
+    os.environ["SYNTHETIC_ERROR_RATE"] = str(error_rate)
+    os.environ["SYNTHETIC_THROTTLE_RATE"] = str(throttle_rate)
+    os.environ["CELERY_TASK_ALWAYS_EAGER"] = "true"
+    os.environ["CELERY_BROKER_URL"] = "memory://"
+    os.environ["CELERY_RESULT_BACKEND"] = "cache+memory://"
+
+
+class InProcessClient:
+    """Sends requests through a Flask test client; each thread gets its own client."""
+
+    def __init__(self):
+        from api import app
+
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, data=None):
+        if not hasattr(self.local, "client"):
+            self.local.client = self.app.test_client()
+        response = self.local.client.open(path, method=method, data=data)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    def __init__(self, base_url, timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read() or b"null")
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+
+class UtilizationSampler(threading.Thread):
+    """Samples the fraction of busy worker processes through Celery's inspect API while the test runs."""
+
+    def __init__(self, interval=1.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        from api.tasks import celery_app
+
+        inspect = celery_app.control.inspect(timeout=self.interval)
+        while not self.stopped.is_set():
+            stats, active = inspect.stats() or {}, inspect.active() or {}
+            capacity = sum(worker["pool"].get("max-concurrency", 0) for worker in stats.values())
+            busy = sum(len(tasks) for tasks in active.values())
+            if capacity:
+                self.samples.append(busy / capacity)
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return statistics.mean(self.samples) if self.samples else None
+
+
+def random_ticker(rng):
+    return "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5)))
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_load(client, n_requests, concurrency, mix, n_tickers, seed=0):
+    """
+    Fires `n_requests` requests from `concurrency` threads, choosing endpoints by the weights in `mix`.
+    `/status` requests poll task ids returned by earlier analysis requests. Returns the per-request records
+    and the wall time.
+    """
+    rng = random.Random(seed)
+    tickers = [random_ticker(rng) for _ in range(n_tickers)]
+    plan = [
+        (rng.choices(ENDPOINTS, weights=[mix[e] for e in ENDPOINTS])[0], rng.choice(tickers)) for _ in range(n_requests)
+    ]
+    task_ids = []
+    task_ids_lock = threading.Lock()
+
+    def send(item):
+        endpoint, ticker = item
+        if endpoint == "status":
+            with task_ids_lock:
+                task_id = rng.choice(task_ids) if task_ids else None
+            if task_id is None:
+                endpoint, path, data = "analyze", "/analyze", {"ticker": ticker}
+            else:
+                path, data = f"/status/{task_id}", None
+        else:
+            path, data = f"/{endpoint}", {"ticker": ticker}
+
+        start = time.perf_counter()
+        try:
+            status_code, body = client.request("POST" if data else "GET", path, data)
+        except Exception:
+            status_code, body = None, None
+        latency = time.perf_counter() - start
+
+        if isinstance(body, dict) and body.get("task_id"):
+            with task_ids_lock:
+                task_ids.append(body["task_id"])
+        return {"endpoint": endpoint, "status": status_code, "latency": latency}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        records = list(pool.map(send, plan))
+    return records, time.perf_counter() - start
+
+
+def report(records, wall_time, utilization):
+    print(f"{len(records)} requests in {wall_time:.2f} s: {len(records) / wall_time:.1f} req/s")
+    print(f"\n{'endpoint':16s} {'count':>6s} {'errors':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    key = lambda record: record["endpoint"]  # noqa: E731
+    for endpoint, group in itertools.groupby(sorted(records, key=key), key=key):
+        group = list(group)
+        latencies = [record["latency"] * 1000 for record in group]
+        errors = sum(1 for record in group if record["status"] != 200)
+        print(
+            f"{endpoint:16s} {len(group):6d} {errors:6d} {percentile(latencies, 50):9.1f} "
+            f"{percentile(latencies, 95):9.1f} {percentile(latencies, 99):9.1f}"
+        )
+    if utilization is None:
+        print("\nWorker utilization: n/a (tasks ran eagerly in the request threads)")
+    else:
+        print(f"\nWorker utilization: {utilization:.0%} of worker processes busy on average")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the API with synthetic data providers.")
+    parser.add_argument("--url", help="Base URL of a running server. Defaults to an in-process app.")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--tickers", type=int, default=20, help="Number of distinct synthetic tickers to request.")
+    parser.add_argument("--mix", default="analyze=2,hybrid_analyze=1,status=7", help="Endpoint weights.")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Synthetic provider latency (in-process only).")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Synthetic provider error rate (in-process only)."
+    )
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="Synthetic provider throttling rate (in-process only)."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    mix = {endpoint: 0.0 for endpoint in ENDPOINTS}
+    for entry in args.mix.split(","):
+        endpoint, _, weight = entry.partition("=")
+        mix[endpoint.strip()] = float(weight)
+
+    sampler = None
+    if args.url:
+        client = HttpClient(args.url)
+        sampler = UtilizationSampler()
+        sampler.start()
+    else:
+        configure_in_process(args.latency_ms, args.error_rate, args.throttle_rate)
+        client = InProcessClient()
+
+    records, wall_time = run_load(client, args.requests, args.concurrency, mix, args.tickers, args.seed)
+    report(records, wall_time, sampler.stop() if sampler else None)
+
+
+if __name__ == "__main__":
+    main()
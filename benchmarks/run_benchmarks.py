@@ -0,0 +1,172 @@
+"""
+Offline performance benchmarks for the analysis pipeline.
+
+Every benchmark runs on synthetic price histories and canned Reddit data (see `api/data/synthetic.py`), so no
+network access is needed. Each case records the median wall time over a few repeats and the peak Python heap
+allocation measured with tracemalloc (native allocations made by TensorFlow or PyTorch are not included).
+
+Usage:
+    python -m benchmarks.run_benchmarks                     # run and compare against the stored baseline
+    python -m benchmarks.run_benchmarks --save-baseline     # run and store the results as the new baseline
+    python -m benchmarks.run_benchmarks --only arima lstm   # run only the cases whose name contains a pattern
+
+The exit status is 1 if any case is slower or uses more memory than the baseline by more than `--threshold`.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from api.data import synthetic
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+PRICE_SIZES = {"1y": 1, "5y": 5, "20y": 20}
+POST_SIZES = (25, 250)
+# Differences smaller than these are treated as measurement noise, whatever the relative change.
+NOISE_FLOOR = {"seconds": 0.005, "peak_mb": 0.5}
+
+
+def _price_cases():
+    from api.analysis import arima_model
+    from api.analysis_engine import create_plot
+    from api.data.stock_data import calculate_technical_indicators
+
+    for label, years in PRICE_SIZES.items():
+        hist = synthetic.generate_price_history(years=years, seed=years)
+
+        yield f"calculate_technical_indicators[{label}]", lambda hist=hist: calculate_technical_indicators(hist.copy())
+        yield f"find_best_arima_order[{label}]", lambda hist=hist: arima_model.find_best_arima_order(hist["Close"])
+
+        plot_df = calculate_technical_indicators(hist.copy())
+        forecast = plot_df["Close"].iloc[-30:].to_numpy()
+        forecast_dates = plot_df.index[-30:]
+        yield f"create_plot[{label}]", lambda df=plot_df, f=forecast, d=forecast_dates: create_plot(df, f, d, "SYN")
+
+
+def _lstm_cases():
+    try:
+        from api.analysis.lstm_model import forecast_with_lstm
+    except ImportError as e:
+        print(f"Skipping LSTM benchmarks: {e}", file=sys.stderr)
+        return
+
+    for label, years in PRICE_SIZES.items():
+        hist = synthetic.generate_price_history(years=years, seed=years)
+        yield f"forecast_with_lstm[{label}]", lambda hist=hist: forecast_with_lstm(hist, steps=30)
+
+
+def _sentiment_cases():
+    from api.data import reddit_data
+
+    for n_posts in POST_SIZES:
+        fake_reddit = synthetic.FakeReddit(n_posts=n_posts)
+
+        def run_reddit(fake_reddit=fake_reddit, n_posts=n_posts):
+            with patch.object(reddit_data, "get_reddit_client", return_value=fake_reddit), patch.object(
+                reddit_data, "POST_LIMIT", n_posts
+            ):
+                return reddit_data.get_reddit_sentiment("SYN")
+
+        yield f"get_reddit_sentiment[{n_posts} posts]", run_reddit
+
+    # FinBERT must already be in the local Hugging Face cache: the hub is forced offline.
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    try:
+        from api.analysis.sentiment import get_finbert, get_finbert_sentiment
+
+        get_finbert()
+    except Exception as e:
+        print(f"Skipping FinBERT benchmarks: {e}", file=sys.stderr)
+        return
+
+    for n_posts in POST_SIZES:
+        posts = [{"title": post.title} for post in synthetic.generate_reddit_posts("SYN", n_posts, n_comments=0)]
+        yield f"get_finbert_sentiment[{n_posts} posts]", lambda posts=posts: get_finbert_sentiment(posts)
+
+
+def collect_cases():
+    yield from _price_cases()
+    yield from _lstm_cases()
+    yield from _sentiment_cases()
+
+
+def measure(fn, repeat):
+    """Returns the median wall time in seconds over `repeat` runs and the peak traced allocation in MB."""
+    fn()  # Warm-up run, so lazy imports and model loading are not counted.
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": statistics.median(timings), "peak_mb": peak / 1024**2}
+
+
+def compare(results, baseline, threshold):
+    """Returns a list of (case, metric, baseline, current) for every metric that regressed beyond the threshold."""
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        for metric, value in metrics.items():
+            reference = baseline[name].get(metric)
+            if reference and value > reference * (1 + threshold) and value - reference > NOISE_FLOOR[metric]:
+                regressions.append((name, metric, reference, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline performance benchmarks.")
+    parser.add_argument("--only", nargs="+", help="Run only cases whose name contains one of these patterns.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the median is reported.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown before flagging.")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, fn in collect_cases():
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        results[name] = measure(fn, args.repeat)
+        print(f"{name:45s} {results[name]['seconds']:10.4f} s {results[name]['peak_mb']:10.2f} MB")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for {len(results)} cases to {args.baseline}.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+
+    for name, metric, reference, value in regressions:
+        print(f"REGRESSION {name} {metric}: {reference:.4f} -> {value:.4f} (+{value / reference - 1:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Throughput of the read endpoints under the sync Flask server and the ASGI entry point (`api/asgi.py`).
+
+A SQLite database is seeded with synthetic analysis results, then each server is started in a subprocess:
+the threaded Werkzeug server that `run.py` uses, and uvicorn serving `api.asgi:app`. Both are polled on
+`/status/<task_id>`, `/data/<ticker>` and `/hybrid_data/<ticker>` by the same async HTTP client. Task status
+comes from CELERY_RESULT_BACKEND; point it at a Redis server to include the Redis reads, otherwise the
+in-memory backend is used.
+
+Usage:
+    python -m benchmarks.serving --requests 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from .loadtest import percentile
+
+SERVERS = {
+    "sync": [sys.executable, "-c", "import sys; from api import app; app.run(port=int(sys.argv[1]), threaded=True)"],
+    "asgi": [sys.executable, "-m", "uvicorn", "api.asgi:app", "--log-level", "warning", "--port"],
+}
+
+
+def benchmark_env(database_path):
+    env = dict(os.environ)
+    env.update(
+        DATABASE_URL=f"sqlite:///{database_path}",
+        DATA_PROVIDER="synthetic",
+        CELERY_BROKER_URL=env.get("CELERY_BROKER_URL", "memory://"),
+        CELERY_RESULT_BACKEND=env.get("CELERY_RESULT_BACKEND", "cache+memory://"),
+    )
+    return env
+
+
+def seed_database(env, n_tickers, plot_kb):
+    """Creates the tables and stores an analysis result for each synthetic ticker. Returns the tickers."""
+    tickers = [f"B{i:03d}" for i in range(n_tickers)]
+    script = (
+        "import sys\n"
+        "from api.database import AnalysisResult, Base, db_session, engine\n"
+        "Base.metadata.drop_all(engine)\n"
+        "Base.metadata.create_all(engine)\n"
+        "plot = 'x' * int(sys.argv[1]) * 1024\n"
+        "for ticker in sys.argv[2:]:\n"
+        "    db_session.add(AnalysisResult(ticker=ticker, arima_plot=plot, hybrid_plot=plot, sentiment=0.1,"
+        " sentiment_posts='[]'))\n"
+        "db_session.commit()\n"
+    )
+    # The seeding runs in a subprocess so this process does not open the database before the servers do.
+    subprocess.run([sys.executable, "-c", script, str(plot_kb), *tickers], env=env, check=True)
+    return tickers
+
+
+def start_server(name, port, env):
+    process = subprocess.Popen([*SERVERS[name], str(port)], env=env, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/data/READY", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"The {name} server did not start.")
+
+
+async def poll(base_url, paths, concurrency):
+    """Requests every path with `concurrency` requests in flight. Returns the latencies, errors and wall time."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    queue = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                path = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    errors += response.status_code != 200
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare read endpoint throughput of the sync and ASGI servers.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--plot-kb", type=int, default=20, help="Size of each stored plot.")
+    parser.add_argument("--servers", nargs="+", default=list(SERVERS), choices=list(SERVERS))
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--database", default="serving_benchmark.db")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = benchmark_env(os.path.abspath(args.database))
+    tickers = seed_database(env, args.tickers, args.plot_kb)
+    rng = random.Random(args.seed)
+    task_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(args.tickers)]
+    paths = [
+        rng.choice(
+            [f"/status/{rng.choice(task_ids)}", f"/data/{rng.choice(tickers)}", f"/hybrid_data/{rng.choice(tickers)}"]
+        )
+        for _ in range(args.requests)
+    ]
+
+    print(f"{'server':8s} {'req/s':>8s} {'errors':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for name in args.servers:
+        process = start_server(name, args.port, env)
+        try:
+            asyncio.run(poll(f"http://127.0.0.1:{args.port}", paths[: args.concurrency], args.concurrency))
+            latencies, errors, wall_time = asyncio.run(poll(f"http://127.0.0.1:{args.port}", paths, args.concurrency))
+        finally:
+            process.terminate()
+            process.wait()
+        latencies = [latency * 1000 for latency in latencies]
+        print(
+            f"{name:8s} {len(paths) / wall_time:8.1f} {errors:7d} {percentile(latencies, 50):8.1f} "
+            f"{percentile(latencies, 95):8.1f} {percentile(latencies, 99):8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
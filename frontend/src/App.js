@@ -59,9 +59,18 @@ function App() {
         const startTime = Date.now();
         const timeout = (analysisType === 'hybrid' ? 5 : 3) * 60 * 1000; // 5 mins for hybrid, 3 for simple
 
+        // Cancel the task if the page is left, so it stops holding a worker.
+        const cancelTask = () => navigator.sendBeacon(`/cancel/${taskId}`);
+        window.addEventListener('pagehide', cancelTask);
+        const stopPolling = () => {
+            clearInterval(interval);
+            window.removeEventListener('pagehide', cancelTask);
+        };
+
         const interval = setInterval(async () => {
             if (Date.now() - startTime > timeout) {
-                clearInterval(interval);
+                stopPolling();
+                cancelTask();
                 setError('Analysis timed out. Please ensure backend services are running and try again.');
                 setLoading(false);
                 setProgress('');
@@ -73,11 +82,11 @@ function App() {
                 const data = await response.json();
 
                 if (data.state === 'SUCCESS') {
-                    clearInterval(interval);
+                    stopPolling();
                     setProgress('');
                     fetchData(ticker);
-                } else if (data.state === 'FAILURE') {
-                    clearInterval(interval);
+                } else if (data.state === 'FAILURE' || data.state === 'REVOKED') {
+                    stopPolling();
                     setError(data.status || 'Analysis failed. Please try again.');
                     setLoading(false);
                     setProgress('');
@@ -86,7 +95,7 @@ function App() {
                 }
 
             } catch (error) {
-                clearInterval(interval);
+                stopPolling();
                 setError('Failed to get analysis status.');
                 setLoading(false);
                 setProgress('');
@@ -108,13 +108,25 @@ function Backtesting() {
                     <h3>Backtesting Results for {ticker.toUpperCase()}</h3>
                     <div>
                         <h4>ARIMA Model</h4>
-                        <p>Mean Absolute Error (MAE): {results.arima_mae.toFixed(4)}</p>
-                        <p>Root Mean Squared Error (RMSE): {results.arima_rmse.toFixed(4)}</p>
+                        {results.arima_mae === null ? (
+                            <p>{results.arima_note}</p>
+                        ) : (
+                            <>
+                                <p>Mean Absolute Error (MAE): {results.arima_mae.toFixed(4)}</p>
+                                <p>Root Mean Squared Error (RMSE): {results.arima_rmse.toFixed(4)}</p>
+                            </>
+                        )}
                     </div>
                     <div>
                         <h4>LSTM Model</h4>
-                        <p>Mean Absolute Error (MAE): {results.lstm_mae.toFixed(4)}</p>
-                        <p>Root Mean Squared Error (RMSE): {results.lstm_rmse.toFixed(4)}</p>
+                        {results.lstm_mae === null ? (
+                            <p>{results.lstm_note}</p>
+                        ) : (
+                            <>
+                                <p>Mean Absolute Error (MAE): {results.lstm_mae.toFixed(4)}</p>
+                                <p>Root Mean Squared Error (RMSE): {results.lstm_rmse.toFixed(4)}</p>
+                            </>
+                        )}
                     </div>
                 </div>
             )}
@@ -0,0 +1,11 @@
+import pytest
+
+from api.data.price_cache import PRICE_CACHE
+
+
+@pytest.fixture(autouse=True)
+def clear_price_cache():
+    """Keeps price histories cached by one test from being served to the next."""
+    PRICE_CACHE.clear()
+    yield
+    PRICE_CACHE.clear()
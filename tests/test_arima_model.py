@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from api.analysis import arima_model
+from api.data.synthetic import generate_price_history
+
+
+def test_sentiment_regressor_aligns_to_trading_days():
+    index = pd.bdate_range("2025-01-06", periods=5, tz="America/New_York")
+    sentiment = pd.Series([0.5, -0.5], index=pd.DatetimeIndex(["2025-01-07", "2025-01-10"]))
+
+    in_sample, future = arima_model.sentiment_regressor(sentiment, index, steps=3)
+
+    np.testing.assert_allclose(in_sample, [0.0, 0.5, 0.0, 0.0, -0.5])
+    np.testing.assert_allclose(future, [0.0] * 3)
+
+
+def test_forecast_stock_price_with_sentiment_fits_arimax():
+    hist = generate_price_history(years=1, seed=1)
+    sentiment = pd.Series(np.sin(np.arange(len(hist)) / 5), index=hist.index.normalize())
+
+    with patch.object(arima_model, "find_best_arima_order", return_value=(1, 1, 0)):
+        forecast, dates = arima_model.forecast_stock_price(hist, steps=5, sentiment=sentiment)
+
+    assert len(forecast) == len(dates) == 5
+    assert np.isfinite(forecast).all()
+
+
+def test_forecast_stock_price_ignores_sentiment_without_overlap():
+    hist = generate_price_history(years=1, seed=1)
+    sentiment = pd.Series([0.5], index=pd.DatetimeIndex(["1999-01-01"]))
+
+    with patch.object(arima_model, "fit_arima_model", wraps=arima_model.fit_arima_model) as fit:
+        with patch.object(arima_model, "find_best_arima_order", return_value=(1, 1, 0)):
+            arima_model.forecast_stock_price(hist, steps=5, sentiment=sentiment)
+
+    assert "exog" not in fit.call_args.kwargs
+
+
+def test_forecast_bands_share_the_point_forecast_model():
+    hist = generate_price_history(years=1, seed=1)
+    sentiment = pd.Series(np.sin(np.arange(len(hist)) / 5), index=hist.index.normalize())
+
+    with patch.object(arima_model, "find_best_arima_order", return_value=(1, 1, 0)):
+        expected, _ = arima_model.forecast_stock_price(hist, steps=5, sentiment=sentiment)
+        forecast, dates, bands = arima_model.forecast_stock_price_with_bands(
+            hist, steps=5, sentiment=sentiment, n_paths=500
+        )
+
+    np.testing.assert_allclose(forecast, expected)
+    assert (bands[5] <= bands[95]).all()
+    assert len(bands[50]) == len(dates) == 5
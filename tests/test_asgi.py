@@ -0,0 +1,77 @@
+import uuid
+
+import fakeredis
+import pytest
+from starlette.testclient import TestClient
+
+from api import app as flask_app
+from api.asgi import app
+from api.database import AnalysisResult, async_database_url, db_session
+from api.exceptions import AnalysisError, TaskCancelledError
+from api.tasks import celery_app
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def client(redis_server):
+    with TestClient(app) as client:
+        client.app.state.redis = fakeredis.FakeAsyncRedis(server=redis_server)
+        yield client
+
+
+def store_meta(redis_server, task_id, status, result):
+    """Writes a task result the way Celery's Redis result backend stores it."""
+    backend = celery_app.backend
+    payload = backend.encode({"status": status, "result": result, "task_id": task_id, "traceback": None})
+    fakeredis.FakeRedis(server=redis_server).set(backend.get_key_for_task(task_id), payload)
+
+
+@pytest.fixture
+def stored_result():
+    ticker = f"T{uuid.uuid4().hex[:4].upper()}"
+    db_session.add(AnalysisResult(ticker=ticker, arima_plot="<div></div>", sentiment=0.25, sentiment_posts="[]"))
+    db_session.commit()
+    yield ticker
+    AnalysisResult.query.filter(AnalysisResult.ticker == ticker).delete()
+    db_session.commit()
+    db_session.remove()
+
+
+def test_async_database_url():
+    assert async_database_url("postgresql://u:p@host:5432/db") == "postgresql+asyncpg://u:p@host:5432/db"
+    assert async_database_url("sqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+
+
+def test_data_endpoints_match_the_flask_responses(client, stored_result):
+    flask_client = flask_app.test_client()
+    for path in (f"/data/{stored_result}", f"/hybrid_data/{stored_result}", "/data/MISSING"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.json() == flask_client.get(path).get_json()
+    assert client.get(f"/data/{stored_result}").json()["sentiment"] == 0.25
+
+
+def test_status_reads_the_result_backend(client, redis_server):
+    store_meta(redis_server, "running", "PROGRESS", {"status": "Fetching stock data..."})
+    store_meta(redis_server, "done", "SUCCESS", {"status": "complete", "result": {"arima_mae": 1.5}})
+    store_meta(redis_server, "failed", "FAILURE", celery_app.backend.prepare_exception(AnalysisError("boom")))
+    store_meta(
+        redis_server, "cancelled", "REVOKED", celery_app.backend.prepare_exception(TaskCancelledError("cancelled"))
+    )
+
+    assert client.get("/status/unknown").json() == {"state": "PENDING", "status": "Pending..."}
+    assert client.get("/status/running").json() == {"state": "PROGRESS", "status": "Fetching stock data..."}
+    assert client.get("/status/done").json() == {"state": "SUCCESS", "status": "complete", "result": {"arima_mae": 1.5}}
+    assert client.get("/status/failed").json() == {"state": "FAILURE", "status": "boom"}
+    assert client.get("/status/cancelled").json() == {"state": "REVOKED", "status": "cancelled"}
+
+
+def test_other_routes_are_served_by_flask(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert b"prestocked_stage_seconds" in response.content
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.analysis.backtest_runner import aggregate_results, load_checkpoint, rolling_origin_folds, run_backtest_suite
+from api.exceptions import AnalysisError
+
+
+def make_prices():
+    index = pd.date_range("2022-01-01", periods=200)
+    return {
+        "AAA": pd.Series(np.linspace(100, 150, 200), index=index),
+        "BBB": pd.Series(100 + np.sin(np.arange(200) / 5), index=index),
+    }
+
+
+def test_rolling_origin_folds():
+    assert rolling_origin_folds(100, n_folds=3, horizon=5) == [85, 90, 95]
+    with pytest.raises(AnalysisError):
+        rolling_origin_folds(100, n_folds=10, horizon=5)
+
+
+def test_run_backtest_suite_resumes(tmp_path):
+    run_dir = str(tmp_path)
+
+    records = run_backtest_suite(make_prices(), models=("drift",), n_folds=3, horizon=5, run_dir=run_dir, max_workers=2)
+    assert len(records) == 6
+    # A linear series is forecast exactly by the drift model.
+    assert all(record["mae"] < 1e-9 for record in records if record["ticker"] == "AAA")
+
+    # Simulate an interrupted write, then resume with an extra model: only the new units run.
+    with open(os.path.join(run_dir, "results.jsonl"), "a") as f:
+        f.write('{"ticker": "AAA", "mod')
+    records = run_backtest_suite(
+        make_prices(), models=("drift", "holt"), n_folds=3, horizon=5, run_dir=run_dir, max_workers=2
+    )
+
+    assert len(records) == 12
+    assert len({(r["ticker"], r["model"], r["fold"]) for r in load_checkpoint(run_dir)}) == 12
+
+
+def test_run_backtest_suite_does_not_resume_other_settings(tmp_path):
+    run_dir = str(tmp_path)
+    prices = make_prices()
+    run_backtest_suite(prices, models=("drift",), n_folds=3, horizon=5, run_dir=run_dir, max_workers=2)
+
+    # A longer horizon and a shorter data window are new units; the old records are not reused or returned.
+    records = run_backtest_suite(prices, models=("drift",), n_folds=3, horizon=10, run_dir=run_dir, max_workers=2)
+    assert len(records) == 6 and all(r["horizon"] == 10 and r["n"] == 10 for r in records)
+
+    shorter = {ticker: series.iloc[:150] for ticker, series in prices.items()}
+    records = run_backtest_suite(shorter, models=("drift",), n_folds=3, horizon=10, run_dir=run_dir, max_workers=2)
+    assert len(records) == 6 and all(r["end_date"] == str(shorter["AAA"].index[-1].date()) for r in records)
+    assert len(load_checkpoint(run_dir)) == 18
+
+
+def test_aggregate_results():
+    records = [
+        {"ticker": "AAA", "model": "drift", "fold": 0, "n": 2, "mae": 1.0, "rmse": 1.0},
+        {"ticker": "AAA", "model": "drift", "fold": 1, "n": 2, "mae": 3.0, "rmse": 3.0},
+    ]
+
+    table = aggregate_results(records)
+
+    assert table.loc[("AAA", "drift"), "mae"] == 2.0
+    assert table.loc[("AAA", "drift"), "rmse"] == pytest.approx(np.sqrt(5.0))
+    assert table.loc[("AAA", "drift"), "units"] == 2
@@ -0,0 +1,116 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.analysis import backtesting
+from api.data.price_cache import PriceHistory
+from api.database import BacktestPrediction, Base
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def make_history(n_days):
+    index = pd.bdate_range("2024-01-01", periods=n_days, name="Date")
+    return pd.DataFrame({"Close": 100 + np.arange(n_days) + 3 * np.sin(np.arange(n_days))}, index=index)
+
+
+def run(session, hist):
+    # A naive forecaster: tomorrow's price is today's.
+    predict = MagicMock(side_effect=lambda model, history, global_model=None: float(history["Close"].iloc[-1]))
+    with patch.object(backtesting, "get_price_history", return_value=PriceHistory.from_frame(hist)):
+        with patch.object(backtesting, "_predict_next_day", predict):
+            results = backtesting.run_backtesting("test", session=session)
+    return results, predict
+
+
+def test_run_backtesting_stores_daily_predictions(session):
+    hist = make_history(20)
+
+    results, predict = run(session, hist)
+
+    assert predict.call_count == 2 * 4
+    assert results["evaluated_days"] == {"arima": 4, "lstm": 4}
+    assert session.query(BacktestPrediction).filter_by(ticker="TEST", model="arima").count() == 4
+
+    errors = hist["Close"].shift(1).iloc[16:] - hist["Close"].iloc[16:]
+    assert results["arima_mae"] == pytest.approx(errors.abs().mean())
+    assert results["lstm_rmse"] == pytest.approx(np.sqrt((errors**2).mean()))
+
+
+def test_run_backtesting_only_evaluates_new_days(session):
+    run(session, make_history(20))
+    hist = make_history(21)
+
+    results, predict = run(session, hist)
+
+    assert predict.call_count == 2
+    assert results["evaluated_days"] == {"arima": 1, "lstm": 1}
+    # The scores cover the whole test period, not only the new day.
+    errors = hist["Close"].shift(1).iloc[16:] - hist["Close"].iloc[16:]
+    assert results["arima_mae"] == pytest.approx(errors.abs().mean())
+
+
+def test_run_backtesting_reuses_all_stored_days(session):
+    run(session, make_history(20))
+
+    results, predict = run(session, make_history(20))
+
+    predict.assert_not_called()
+    assert results["evaluated_days"] == {"arima": 0, "lstm": 0}
+
+
+def test_global_lstm_is_only_scored_after_its_training_data(session):
+    hist = make_history(20)
+    meta = {"trained_at": "2024-02-01T02:00:00", "train_end": str(hist.index[17].date())}
+    model = MagicMock()
+
+    with patch.object(backtesting, "load_global_lstm", return_value=(model, meta)):
+        results, predict = run(session, hist)
+
+    assert results["evaluated_days"] == {"arima": 4, "lstm": 2}
+    stored = session.query(BacktestPrediction).filter_by(model="lstm").all()
+    assert {row.config for row in stored} == {"period=1y;lstm=global@2024-02-01T02:00:00"}
+    assert [row.date for row in stored] == [day.date() for day in hist.index[18:]]
+    # The predictions stored under the global key come from that global model.
+    assert {call.kwargs["global_model"] for call in predict.call_args_list if call.args[0] == "lstm"} == {model}
+
+
+def test_global_lstm_trained_on_the_whole_test_period_is_not_scored(session):
+    hist = make_history(20)
+    meta = {"trained_at": "2024-02-01T02:00:00", "train_end": str(hist.index[-1].date())}
+
+    with patch.object(backtesting, "load_global_lstm", return_value=(MagicMock(), meta)):
+        results, _ = run(session, hist)
+
+    assert results["evaluated_days"]["lstm"] == 0
+    assert results["lstm_mae"] is None and results["lstm_rmse"] is None
+    assert "GLOBAL_LSTM_HOLDOUT_DAYS" in results["lstm_note"]
+
+
+def test_models_without_scored_days_get_a_generic_note(session):
+    with patch.object(backtesting, "load_predictions", return_value=[]):
+        results, _ = run(session, make_history(20))
+
+    for model in ("arima", "lstm"):
+        assert results[f"{model}_mae"] is None
+        assert "GLOBAL_LSTM_HOLDOUT_DAYS" not in results[f"{model}_note"]
+
+
+def test_global_mode_without_a_usable_model_is_keyed_per_ticker(session):
+    with patch.object(backtesting.Config, "LSTM_MODE", "global"):
+        with patch.object(backtesting.global_lstm, "get_global_model", side_effect=FileNotFoundError("no metadata")):
+            run(session, make_history(20))
+
+    stored = session.query(BacktestPrediction).filter_by(model="lstm").all()
+    assert {row.config for row in stored} == {"period=1y"}
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.analysis.baseline_model import (
+    forecast_ar,
+    forecast_baseline,
+    forecast_drift,
+    forecast_holt,
+    forecast_stock_price_fast,
+    forecast_universe,
+)
+from api.exceptions import AnalysisError
+
+
+def test_linear_prices_are_extrapolated():
+    prices = np.array([100 + 2 * np.arange(50), 50 - 0.5 * np.arange(50)])
+    expected = prices[:, -1:] + np.array([[2], [-0.5]]) * np.arange(1, 11)
+
+    np.testing.assert_allclose(forecast_drift(prices, steps=10), expected)
+    np.testing.assert_allclose(forecast_holt(prices, steps=10), expected)
+    np.testing.assert_allclose(forecast_ar(prices, steps=10, p=2), expected, atol=1e-4)
+
+
+def test_ar_batch_matches_single_ticker():
+    rng = np.random.default_rng(0)
+    prices = 100 + np.cumsum(rng.normal(size=(3, 300)), axis=1)
+
+    batch = forecast_ar(prices, steps=5, p=3)
+
+    for i in range(3):
+        np.testing.assert_allclose(batch[i], forecast_ar(prices[i], steps=5, p=3)[0])
+
+
+def test_forecast_baseline_rejects_bad_input():
+    with pytest.raises(AnalysisError):
+        forecast_baseline(np.ones((2, 50)), method="unknown")
+    with pytest.raises(AnalysisError):
+        forecast_baseline(np.array([[1.0, np.nan, 3.0]]))
+
+
+def test_forecast_stock_price_fast_shape():
+    df = pd.DataFrame({"Close": [100 + i for i in range(100)]}, index=pd.date_range("2022-01-01", periods=100))
+
+    forecast, forecast_dates = forecast_stock_price_fast(df, steps=10, method="ar")
+
+    assert len(forecast) == 10
+    assert len(forecast_dates) == 10
+    assert forecast_dates[0] == pd.Timestamp("2022-04-11")
+
+
+def test_forecast_universe_skips_incomplete_tickers():
+    index = pd.date_range("2022-01-01", periods=60)
+    close = pd.DataFrame({"AAA": np.linspace(10, 20, 60), "BBB": np.linspace(20, 10, 60)}, index=index)
+    close.iloc[:5, 1] = np.nan
+
+    forecast, forecast_dates = forecast_universe(close, steps=5, method="drift")
+
+    assert list(forecast.columns) == ["AAA"]
+    assert forecast.shape == (5, 1)
+    assert (forecast.index == forecast_dates).all()
@@ -0,0 +1,167 @@
+import contextlib
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from celery.backends.cache import CacheBackend
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api import budgets, tasks
+from api.analysis import arima_model, backtesting
+from api.config import Config
+from api.data.price_cache import PriceHistory
+from api.database import BacktestPrediction, Base
+from api.exceptions import StageTimeoutError, TaskCancelledError
+
+
+def exceeded(stage, budget):
+    return (
+        REGISTRY.get_sample_value("prestocked_stage_budget_exceeded_total", {"stage": stage, "budget": budget}) or 0.0
+    )
+
+
+def test_parse_stage_budgets():
+    assert budgets.parse_stage_budgets("arima=20:90; sentiment=0:45;lstm=60;") == {
+        "arima": (20.0, 90.0),
+        "sentiment": (None, 45.0),
+        "lstm": (60.0, None),
+    }
+    assert budgets.parse_stage_budgets("") == {}
+
+
+def test_stage_budget_interrupts_at_the_hard_budget():
+    before = exceeded("slow", "hard")
+    start = time.monotonic()
+    with pytest.raises(StageTimeoutError):
+        with budgets.stage_budget("slow", {"slow": (None, 0.05)}):
+            time.sleep(2)
+    assert time.monotonic() - start < 1
+    assert exceeded("slow", "hard") == before + 1
+
+
+def test_stage_budget_only_records_overruns_outside_the_main_thread():
+    errors = []
+
+    def run():
+        try:
+            with budgets.stage_budget("threaded", {"threaded": (0.01, 0.02)}):
+                time.sleep(0.05)
+        except Exception as e:
+            errors.append(e)
+
+    before = exceeded("threaded", "soft"), exceeded("threaded", "hard")
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert errors == []
+    assert (exceeded("threaded", "soft"), exceeded("threaded", "hard")) == (before[0] + 1, before[1] + 1)
+
+
+def test_order_search_stops_at_the_deadline_and_marks_the_stage_degraded():
+    data = pd.Series(100 + np.arange(60, dtype=float))
+    with budgets.stage_budget("arima", {"arima": (0.01, None)}) as budget:
+        with patch.object(arima_model, "ARIMA") as arima:
+            assert arima_model.find_best_arima_order(data, deadline=time.monotonic() - 1) is None
+    arima.assert_not_called()
+    assert budget.degraded
+
+
+def test_order_search_does_not_swallow_a_hard_timeout():
+    data = pd.Series(100 + np.arange(60, dtype=float))
+    with patch.object(arima_model, "ARIMA", side_effect=StageTimeoutError("out of time")):
+        with pytest.raises(StageTimeoutError):
+            arima_model.find_best_arima_order(data)
+
+
+def test_cancelled_task_stops_at_the_next_stage():
+    store = {}
+    backend = tasks.celery_app.backend
+    task = SimpleNamespace(request=SimpleNamespace(id="task-1"), update_state=MagicMock())
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.object(backend, "set", side_effect=store.__setitem__))
+        stack.enter_context(patch.object(backend, "get", side_effect=store.get))
+        revoke = stack.enter_context(patch.object(tasks.celery_app.control, "revoke"))
+        tasks.start_stage(task, "Fetching stock data...")
+        tasks.cancel_task("task-1")
+        with pytest.raises(TaskCancelledError):
+            tasks.start_stage(task, "Generating ARIMA forecast...")
+    revoke.assert_called_once_with("task-1")
+    task.update_state.assert_called_once_with(state="PROGRESS", meta={"status": "Fetching stock data..."})
+
+
+def test_cancelled_task_keeps_its_revoked_state():
+    backend = CacheBackend(app=tasks.celery_app, backend="memory")
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.object(tasks.run_full_analysis, "_backend", backend))
+        stack.enter_context(patch.object(tasks, "is_cancelled", return_value=True))
+        get_stock_data = stack.enter_context(patch.object(tasks.analysis_engine, "get_stock_data"))
+        tasks.run_full_analysis.apply(args=["AAPL"], task_id="cancelled-task")
+
+    get_stock_data.assert_not_called()
+    meta = backend.get_task_meta("cancelled-task")
+    assert meta["status"] == "REVOKED"
+    assert isinstance(meta["result"], TaskCancelledError)
+
+
+def test_cancelled_backtest_stops_before_its_next_prediction():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    index = pd.bdate_range("2024-01-01", periods=40)
+    hist = pd.DataFrame({"Close": 100 + np.arange(40, dtype=float)}, index=index)
+    predict = MagicMock(side_effect=lambda model, history, global_model=None: float(history["Close"].iloc[-1]))
+    backend = CacheBackend(app=tasks.celery_app, backend="memory")
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.object(tasks.run_backtesting_task, "_backend", backend))
+        stack.enter_context(patch.object(tasks, "is_cancelled", side_effect=lambda task_id: predict.call_count >= 3))
+        stack.enter_context(patch.object(backtesting, "db_session", session))
+        stack.enter_context(patch.object(backtesting, "get_price_history", return_value=PriceHistory.from_frame(hist)))
+        stack.enter_context(patch.object(backtesting, "_predict_next_day", predict))
+        tasks.run_backtesting_task.apply(args=["TEST"], task_id="cancelled-backtest")
+
+    assert predict.call_count == 3
+    assert backend.get_task_meta("cancelled-backtest")["status"] == "REVOKED"
+    # The predictions made before the cancellation are kept for the next run.
+    assert session.query(BacktestPrediction).count() == 3
+    session.close()
+
+
+def test_slow_sentiment_is_skipped_and_the_result_marked_partial():
+    index = pd.date_range("2024-01-01", periods=60, freq="D")
+    hist = pd.DataFrame({"Close": 100 + np.arange(60, dtype=float)}, index=index)
+    forecast = pd.Series(np.full(30, 160.0))
+    bands = {5: forecast.to_numpy() - 10, 95: forecast.to_numpy() + 10}
+
+    def slow_sentiment(ticker_symbol):
+        time.sleep(2)
+
+    analysis_engine = tasks.analysis_engine
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.object(Config, "STAGE_BUDGETS", "sentiment=0:0.05"))
+        stack.enter_context(patch.object(Config, "SENTIMENT_SOURCE", "live"))
+        stack.enter_context(patch.object(tasks, "start_stage"))
+        save = stack.enter_context(patch.object(tasks, "save_analysis_result"))
+        stack.enter_context(patch.object(analysis_engine, "get_stock_data", return_value=({}, hist)))
+        stack.enter_context(patch.object(analysis_engine, "calculate_technical_indicators", side_effect=lambda df: df))
+        stack.enter_context(
+            patch.object(analysis_engine, "forecast_stock_price_with_bands", return_value=(forecast, index[:30], bands))
+        )
+        stack.enter_context(patch.object(analysis_engine, "get_reddit_sentiment", side_effect=slow_sentiment))
+        create_plot = stack.enter_context(patch.object(analysis_engine, "create_plot", return_value="<plot>"))
+        result = tasks.run_full_analysis.run("AAPL")
+
+    assert result == {
+        "status": "complete",
+        "ticker": "AAPL",
+        "result": {"partial": True, "degraded_stages": ["sentiment"]},
+    }
+    assert save.call_args.kwargs["sentiment"] == 0.0
+    # The forecast bands are drawn, unadjusted since the sentiment was skipped.
+    np.testing.assert_allclose(create_plot.call_args.kwargs["bands"][95], 170.0)
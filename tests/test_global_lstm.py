@@ -0,0 +1,117 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.analysis import global_lstm, lstm_model
+from api.config import Config
+from api.data.price_cache import PriceHistory
+from api.exceptions import AnalysisError
+
+
+class ConstantReturnModel:
+    """Stands in for the trained network: predicts a constant daily log return for every ticker."""
+
+    input_shape = (None, 5, 1)
+    output_shape = (None, 3)
+
+    def __init__(self, daily_return):
+        self.daily_return = daily_return
+        self.batches = []
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        self.batches.append(inputs.shape)
+        return np.tile(self.daily_return * np.arange(1, 4), (len(inputs), 1))
+
+
+def test_make_windows_normalizes_by_last_close():
+    closes = np.exp(np.arange(10, dtype=float) * 0.1) * 50
+
+    inputs, targets = global_lstm.make_windows(closes, window=4, horizon=2)
+
+    assert inputs.shape == (5, 4, 1) and targets.shape == (5, 2)
+    np.testing.assert_allclose(inputs[0, :, 0], [-0.3, -0.2, -0.1, 0.0], atol=1e-6)
+    np.testing.assert_allclose(targets, np.tile([0.1, 0.2], (5, 1)), atol=1e-6)
+
+
+def test_build_training_set_skips_short_series_and_rejects_all_short():
+    inputs, _ = global_lstm.build_training_set([np.ones(10) * 5, np.ones(3)], window=4, horizon=2)
+    assert len(inputs) == 5
+
+    with pytest.raises(AnalysisError):
+        global_lstm.build_training_set([np.ones(3)], window=4, horizon=2)
+
+
+def test_forecast_many_batches_tickers_and_extends_beyond_horizon():
+    model = ConstantReturnModel(daily_return=0.01)
+    prices = [np.linspace(90, 100, 20), np.linspace(10, 20, 8)]
+
+    forecast = global_lstm.forecast_many(prices, steps=7, model=model)
+
+    assert forecast.shape == (2, 7)
+    # 7 steps with a 3-day output take three forward passes, each over both tickers.
+    assert model.batches == [(2, 5, 1)] * 3
+    np.testing.assert_allclose(forecast[0], 100 * np.exp(0.01 * np.arange(1, 8)))
+    np.testing.assert_allclose(forecast[1], 20 * np.exp(0.01 * np.arange(1, 8)))
+
+
+def test_forecast_many_requires_a_full_window():
+    with pytest.raises(AnalysisError):
+        global_lstm.forecast_many([np.ones(4)], steps=3, model=ConstantReturnModel(0.0))
+
+
+@patch.object(Config, "LSTM_MODE", "global")
+def test_forecast_with_lstm_uses_global_model():
+    df = pd.DataFrame({"Close": np.linspace(100, 110, 30)})
+
+    with patch.object(global_lstm, "get_global_model", return_value=(ConstantReturnModel(0.0), {})):
+        forecast = lstm_model.forecast_with_lstm(df, steps=4)
+
+    np.testing.assert_allclose(forecast, [110.0] * 4)
+
+
+def test_train_save_and_load_global_model(tmp_path):
+    path = str(tmp_path / "global_lstm.keras")
+    prices = [100 * np.exp(np.cumsum(np.full(120, 0.001))), 20 * np.exp(np.cumsum(np.full(100, -0.001)))]
+
+    _, meta = global_lstm.train_global_model(prices, path=path, epochs=1, window=10, horizon=5, tickers=["A", "B"])
+    model, loaded_meta = global_lstm.get_global_model(path)
+    forecast = global_lstm.forecast_many(prices, steps=8, model=model)
+
+    assert meta["tickers"] == ["A", "B"] and meta["windows"] == 106 + 86
+    assert loaded_meta == global_lstm.model_metadata(path) == meta
+    assert forecast.shape == (2, 8)
+    assert np.isfinite(forecast).all()
+
+
+@pytest.mark.parametrize("sidecar", [None, "{not json"])
+def test_global_model_without_readable_metadata_is_not_used(tmp_path, sidecar):
+    path = str(tmp_path / "global_lstm.keras")
+    prices = [100 * np.exp(np.cumsum(np.full(40, 0.001)))]
+    global_lstm.train_global_model(prices, path=path, epochs=1, window=10, horizon=5)
+    if sidecar is None:
+        (tmp_path / "global_lstm.keras.json").unlink()
+    else:
+        (tmp_path / "global_lstm.keras.json").write_text(sidecar)
+
+    with pytest.raises(FileNotFoundError):
+        global_lstm.get_global_model(path)
+
+    df = pd.DataFrame({"Close": np.linspace(100, 110, 80)})
+    with patch.object(Config, "LSTM_MODE", "global"), patch.object(Config, "GLOBAL_LSTM_PATH", path):
+        with patch.object(lstm_model, "forecast_with_ticker_lstm", return_value=np.ones(3)) as per_ticker:
+            lstm_model.forecast_with_lstm(df, steps=3)
+    per_ticker.assert_called_once()
+
+
+def test_train_from_tickers_holds_out_the_last_days():
+    index = pd.bdate_range("2024-01-01", periods=200)
+    hist = pd.DataFrame({"Close": np.linspace(100, 120, 200)}, index=index)
+
+    with patch.object(global_lstm, "get_price_history", return_value=PriceHistory.from_frame(hist)):
+        with patch.object(global_lstm, "train_global_model", return_value=(None, {})) as train:
+            global_lstm.train_from_tickers(["AAA"], holdout_days=50)
+
+    assert len(train.call_args.args[0][0]) == 150
+    assert train.call_args.kwargs["train_end"] == str(index[149].date())
@@ -0,0 +1,46 @@
+import numpy as np
+
+from api.hybrid_analysis import fit_ensemble_weights, run_batch_ensemble_prediction, run_ensemble_prediction
+
+
+def test_batch_ensemble_matches_single_ticker():
+    rng = np.random.default_rng(0)
+    arima = 100 + rng.normal(size=(4, 30))
+    lstm = 100 + rng.normal(size=(4, 30))
+    sentiments = np.array([0.5, -0.2, 0.0, 1.0])
+
+    batch = run_batch_ensemble_prediction(arima, lstm, sentiments)
+
+    assert batch.shape == (4, 30)
+    for i in range(4):
+        np.testing.assert_allclose(batch[i], run_ensemble_prediction(arima[i], lstm[i], sentiments[i]))
+
+
+def test_fit_ensemble_weights():
+    arima_errors = np.array([[1.0, -1.0], [2.0, 2.0], [np.nan, np.nan]])
+    lstm_errors = np.array([[1.0, 1.0], [1.0, -1.0], [np.nan, np.nan]])
+
+    weights = fit_ensemble_weights(arima_errors, lstm_errors)
+
+    np.testing.assert_allclose(weights["arima"] + weights["lstm"], 1.0)
+    # Equal errors and missing errors both give the default split.
+    np.testing.assert_allclose(weights["arima"][[0, 2]], 0.5)
+    # The LSTM has a quarter of the ARIMA squared error, so it gets four fifths of the model weight.
+    np.testing.assert_allclose(weights["lstm"][1], 0.8)
+
+    # With neutral sentiment the ensemble stays at the models' price level.
+    batch = run_batch_ensemble_prediction(np.ones((3, 5)), np.ones((3, 5)), np.zeros(3), weights=weights)
+    np.testing.assert_allclose(batch, 1.0)
+
+
+def test_default_weights_match_equal_error_fitted_weights():
+    rng = np.random.default_rng(1)
+    arima = 100 + rng.normal(size=(2, 10))
+    lstm = 100 + rng.normal(size=(2, 10))
+    sentiments = np.array([0.3, -0.4])
+    errors = np.ones((2, 5))
+
+    fitted = run_batch_ensemble_prediction(arima, lstm, sentiments, weights=fit_ensemble_weights(errors, errors))
+
+    np.testing.assert_allclose(run_batch_ensemble_prediction(arima, lstm, sentiments), fitted)
+    np.testing.assert_allclose(run_ensemble_prediction(arima[0], lstm[0], sentiments[0]), fitted[0])
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pytest
+
+from api.metrics import REGISTRY, count_task_outcome, metrics_payload, record_cache, stage_timer, timed
+
+
+def sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_stage_timer_records_failures_too():
+    before = sample("prestocked_stage_seconds_count", {"stage": "test_stage"})
+
+    with stage_timer("test_stage"):
+        pass
+    with pytest.raises(ValueError), stage_timer("test_stage"):
+        raise ValueError
+
+    assert sample("prestocked_stage_seconds_count", {"stage": "test_stage"}) == before + 2
+
+
+def test_timed_decorator():
+    @timed("test_decorated")
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    assert sample("prestocked_stage_seconds_count", {"stage": "test_decorated"}) == 1
+
+
+def test_cache_and_outcome_counters():
+    record_cache("test_cache", hit=True)
+    record_cache("test_cache", hit=False)
+    task = SimpleNamespace(name="api.tasks.run_full_analysis")
+    count_task_outcome(task=task, retval={"status": "failure", "error": "boom"}, state="SUCCESS")
+
+    assert sample("prestocked_cache_requests_total", {"cache": "test_cache", "result": "hit"}) == 1
+    assert sample("prestocked_cache_requests_total", {"cache": "test_cache", "result": "miss"}) == 1
+    assert sample("prestocked_task_outcomes_total", {"task": "run_full_analysis", "outcome": "failure"}) == 1
+
+    body, content_type = metrics_payload()
+    assert b"prestocked_stage_seconds" in body
+    assert content_type.startswith("text/plain")
@@ -0,0 +1,133 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.config import Config
+from api.data import stock_data
+from api.data.price_cache import PriceCache, PriceHistory
+from api.data.synthetic import generate_price_history
+
+
+def make_history(days=100):
+    return PriceHistory.from_frame(generate_price_history(years=days / 252, seed=days))
+
+
+def test_price_history_keeps_only_close_as_read_only_float32():
+    hist = generate_price_history(years=1)
+
+    history = PriceHistory.from_frame(hist)
+
+    assert history.values.shape == (1, len(hist))
+    assert history.values.dtype == np.float32
+    assert not history.values.flags.writeable
+    assert history.nbytes == len(hist) * (4 + 8)
+    np.testing.assert_allclose(history.values[0], hist["Close"], rtol=1e-6)
+
+
+def test_frames_share_the_cached_arrays():
+    history = make_history()
+
+    frame = history.frame()
+    frame["SMA5"] = frame["Close"].rolling(5).mean()
+
+    assert np.shares_memory(frame["Close"].to_numpy(), history.values)
+    assert list(history.frame().columns) == ["Close"]
+
+
+def test_cache_evicts_least_recently_used_entries_by_bytes():
+    history = make_history()
+    cache = PriceCache(max_bytes=2 * history.nbytes, ttl=60)
+
+    cache.put("a", history)
+    cache.put("b", make_history())
+    cache.get("a")
+    cache.put("c", make_history())
+
+    assert cache.get("a") is history
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.nbytes == 2 * history.nbytes
+
+
+def test_cache_expires_old_entries():
+    cache = PriceCache(max_bytes=10**6, ttl=60)
+    with patch("api.data.price_cache.time.monotonic", return_value=0.0):
+        cache.put("a", make_history())
+    with patch("api.data.price_cache.time.monotonic", return_value=61.0):
+        assert cache.get("a") is None
+    assert cache.nbytes == 0
+
+
+def test_get_or_load_loads_once():
+    cache = PriceCache(max_bytes=10**6, ttl=60)
+    loader = MagicMock(return_value=make_history())
+
+    first = cache.get_or_load("a", loader)
+    second = cache.get_or_load("a", loader)
+
+    assert first is second
+    loader.assert_called_once()
+
+
+def test_concurrent_get_or_load_calls_the_loader_once():
+    # The history is larger than the cache, so later callers can only get it from the load in progress.
+    cache = PriceCache(max_bytes=1, ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def load():
+        started.set()
+        release.wait(5)
+        return make_history()
+
+    loader = MagicMock(side_effect=load)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("a", loader))) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Release the load once every caller is queued on it.
+    deadline = time.monotonic() + 5
+    while cache.loading["a"].callers < len(threads) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    loader.assert_called_once()
+    assert len(results) == 8 and all(history is results[0] for history in results)
+    assert cache.loading == {}
+
+
+def test_get_or_load_does_not_cache_failures():
+    cache = PriceCache(max_bytes=10**6, ttl=60)
+
+    with pytest.raises(ValueError):
+        cache.get_or_load("a", MagicMock(side_effect=ValueError("no data")))
+    assert cache.get_or_load("a", make_history) is not None
+
+
+@patch.object(Config, "DATA_PROVIDER", "synthetic")
+def test_get_stock_data_shares_one_fetch():
+    with patch.object(stock_data, "get_ticker", wraps=stock_data.get_ticker) as get_ticker:
+        info, first = stock_data.get_stock_data("TEST")
+        _, second = stock_data.get_stock_data("test")
+
+    get_ticker.assert_called_once()
+    assert info["symbol"] == "TEST"
+    assert isinstance(first.index, pd.DatetimeIndex)
+    assert np.shares_memory(first["Close"].to_numpy(), second["Close"].to_numpy())
+
+
+@patch.object(Config, "DATA_PROVIDER", "synthetic")
+def test_history_cached_without_info_is_refetched_with_info():
+    stock_data.get_price_history("TEST")
+
+    history = stock_data.get_price_history("TEST", with_info=True)
+
+    assert history.info["symbol"] == "TEST"
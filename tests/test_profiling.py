@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from api import profiling
+from api.config import Config
+
+
+class FakeRequest(dict):
+    def __init__(self, task_id, **headers):
+        super().__init__(headers)
+        self.id = task_id
+
+
+def make_task(task_id, **headers):
+    return SimpleNamespace(request=FakeRequest(task_id, **headers), name="api.tasks.run_full_analysis")
+
+
+@profiling.profile_task
+def sample_task(self, n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    with patch.object(Config, "PROFILE_DIR", str(tmp_path)), patch.object(Config, "PROFILE_SAMPLE_RATE", 0.0):
+        yield tmp_path
+
+
+def test_unprofiled_task_runs_without_profiler(profile_dir):
+    with patch("api.profiling.cProfile.Profile") as mock_profile:
+        assert sample_task(make_task("task-1"), 10) == 285
+
+    mock_profile.assert_not_called()
+    assert profiling.list_profiles() == []
+
+
+def test_profile_header_saves_and_summarizes(profile_dir):
+    assert sample_task(make_task("task-2", profile=True), 10000) == sum(i * i for i in range(10000))
+
+    profiles = profiling.list_profiles()
+    assert [meta["task_id"] for meta in profiles] == ["task-2"]
+    assert profiles[0]["args"] == ["10000"]
+
+    summary = profiling.summarize_profile("task-2", limit=5)
+    assert len(summary["functions"]) <= 5
+    assert any("sample_task" in row["function"] for row in summary["functions"])
+    assert summary["allocations"]
+
+
+def test_summarize_profile_rejects_unknown_and_unsafe_ids(profile_dir):
+    with pytest.raises(FileNotFoundError):
+        profiling.summarize_profile("missing")
+    with pytest.raises(ValueError):
+        profiling.summarize_profile("../etc")
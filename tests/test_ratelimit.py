@@ -0,0 +1,127 @@
+from unittest.mock import patch
+
+import pytest
+
+from api.data.synthetic import SyntheticRateLimitError, SyntheticTicker
+from api.ratelimit import (
+    LocalTokenBucket,
+    RateLimiter,
+    RedisTokenBucket,
+    call_with_backoff,
+    is_throttled,
+    parse_rate_limits,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ThrottlingProvider:
+    """A fake provider that answers "too many requests" a fixed number of times before succeeding."""
+
+    def __init__(self, throttled_calls):
+        self.throttled_calls = throttled_calls
+        self.calls = 0
+
+    def fetch(self, ticker):
+        self.calls += 1
+        if self.calls <= self.throttled_calls:
+            raise SyntheticRateLimitError("Too Many Requests")
+        return f"data for {ticker}"
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("yahoo=2:5; reddit=0.5") == {"yahoo": (2.0, 5.0), "reddit": (0.5, 0.5)}
+    assert parse_rate_limits("") == {}
+
+
+def test_local_bucket_allows_burst_then_paces_requests():
+    clock = FakeClock()
+    limiter = RateLimiter(LocalTokenBucket(clock=clock), {"yahoo": (2.0, 3.0)}, sleep=clock.sleep)
+
+    waits = [limiter.acquire("yahoo") for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3:] == pytest.approx([0.5, 0.5])
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_limiter_ignores_providers_without_a_budget():
+    limiter = RateLimiter(LocalTokenBucket(), {}, sleep=pytest.fail)
+
+    assert limiter.acquire("unknown") == 0.0
+
+
+def test_redis_bucket_is_shared_between_limiters():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    limits = {"reddit": (1.0, 2.0)}
+    first = RateLimiter(RedisTokenBucket(fakeredis.FakeRedis(server=server)), limits, sleep=lambda s: None)
+    second = RateLimiter(RedisTokenBucket(fakeredis.FakeRedis(server=server)), limits, sleep=lambda s: None)
+
+    waits = [first.acquire("reddit"), second.acquire("reddit"), first.acquire("reddit"), second.acquire("reddit")]
+
+    assert waits[:2] == [0.0, 0.0]
+    # The two reservations past the burst queue behind each other: about one and two seconds out.
+    assert waits[2] == pytest.approx(1.0, abs=0.1)
+    assert waits[3] == pytest.approx(2.0, abs=0.1)
+
+
+def test_limiter_does_not_block_when_the_bucket_is_unavailable():
+    class BrokenBucket:
+        def reserve(self, provider, rate, capacity):
+            raise ConnectionError("Redis is down")
+
+    limiter = RateLimiter(BrokenBucket(), {"yahoo": (1.0, 1.0)}, sleep=pytest.fail)
+
+    assert limiter.acquire("yahoo") == 0.0
+
+
+def test_call_with_backoff_retries_throttled_calls():
+    provider = ThrottlingProvider(throttled_calls=2)
+    limiter = RateLimiter(LocalTokenBucket(), {})
+    delays = []
+
+    with patch("api.ratelimit.random.uniform", side_effect=lambda low, high: high):
+        result = call_with_backoff("yahoo", provider.fetch, "AAPL", limiter=limiter, sleep=delays.append)
+
+    assert result == "data for AAPL"
+    assert provider.calls == 3
+    # Full jitter draws up to base * 2**attempt; the patched draw returns the upper bound.
+    assert delays == [0.5, 1.0]
+
+
+def test_call_with_backoff_gives_up_after_retries():
+    provider = ThrottlingProvider(throttled_calls=10)
+    limiter = RateLimiter(LocalTokenBucket(), {})
+
+    with pytest.raises(SyntheticRateLimitError):
+        call_with_backoff("yahoo", provider.fetch, "AAPL", retries=2, limiter=limiter, sleep=lambda s: None)
+    assert provider.calls == 3
+
+
+def test_call_with_backoff_does_not_retry_other_errors():
+    limiter = RateLimiter(LocalTokenBucket(), {})
+
+    def fail():
+        raise ValueError("bad ticker")
+
+    with pytest.raises(ValueError):
+        call_with_backoff("yahoo", fail, limiter=limiter, sleep=pytest.fail)
+
+
+def test_synthetic_throttling_is_recognized():
+    with patch("api.data.synthetic.Config.SYNTHETIC_THROTTLE_RATE", 1.0):
+        with pytest.raises(SyntheticRateLimitError) as exc_info:
+            SyntheticTicker("AAPL").history(period="1y")
+
+    assert is_throttled(exc_info.value)
+    assert not is_throttled(ValueError("bad ticker"))
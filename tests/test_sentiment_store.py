@@ -0,0 +1,103 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.config import Config
+from api.data import reddit_data, sentiment_store
+from api.database import AnalysisResult, Base, DailySentiment
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@patch.object(Config, "DATA_PROVIDER", "synthetic")
+def test_get_daily_reddit_sentiment_groups_posts_by_day():
+    daily = reddit_data.get_daily_reddit_sentiment("TEST")
+
+    assert sum(posts for _, posts in daily.values()) == reddit_data.POST_LIMIT
+    assert all(isinstance(day, datetime.date) for day in daily)
+    assert all(-1 <= score <= 1 for score, _ in daily.values())
+
+
+@patch.object(Config, "DATA_PROVIDER", "synthetic")
+def test_update_daily_sentiment_stores_one_row_per_day(session):
+    written = sentiment_store.update_daily_sentiment("test", session=session)
+
+    rows = session.query(DailySentiment).filter_by(ticker="TEST").all()
+    assert written == len(rows) > 1
+    assert len({row.date for row in rows}) == len(rows)
+
+
+@patch.object(Config, "DATA_PROVIDER", "synthetic")
+def test_get_daily_reddit_sentiment_stops_at_posts_before_since():
+    full = reddit_data.get_daily_reddit_sentiment("TEST")
+    since = sorted(full)[len(full) // 2]
+    recent_posts = sum(posts for day, (_, posts) in full.items() if day >= since)
+
+    with patch.object(reddit_data, "_analyze_post", wraps=reddit_data._analyze_post) as analyze:
+        daily = reddit_data.get_daily_reddit_sentiment("TEST", since=since)
+
+    assert min(daily) == since
+    # Older posts are neither scored nor have their comments fetched.
+    assert analyze.call_count == recent_posts
+
+
+def test_update_daily_sentiment_only_rewrites_from_the_last_stored_day(session):
+    first = {datetime.date(2025, 1, 1): (0.5, 2), datetime.date(2025, 1, 2): (0.1, 1)}
+    second = {
+        datetime.date(2025, 1, 1): (-0.9, 3),
+        datetime.date(2025, 1, 2): (0.3, 4),
+        datetime.date(2025, 1, 3): (0.2, 1),
+    }
+    with patch.object(sentiment_store, "get_daily_reddit_sentiment", side_effect=[first, second]) as fetch:
+        sentiment_store.update_daily_sentiment("TEST", session=session)
+        written = sentiment_store.update_daily_sentiment("TEST", session=session)
+
+    series = sentiment_store.load_daily_sentiment("TEST", session=session)
+    assert fetch.call_args.kwargs["since"] == datetime.date(2025, 1, 2)
+    assert written == 2
+    # The first day was final and keeps its score; the last stored day is updated.
+    assert series.tolist() == [0.5, 0.3, 0.2]
+    assert session.query(DailySentiment).filter_by(date=datetime.date(2025, 1, 2)).one().posts == 4
+
+
+def test_load_daily_sentiment_filters_by_start_date(session):
+    for day in range(1, 4):
+        session.add(DailySentiment(ticker="TEST", date=datetime.date(2025, 1, day), score=day / 10, posts=1))
+    session.commit()
+
+    series = sentiment_store.load_daily_sentiment("test", start_date=datetime.date(2025, 1, 2), session=session)
+
+    assert list(series.index.day) == [2, 3]
+    assert sentiment_store.load_daily_sentiment("OTHER", session=session).empty
+
+
+def test_tracked_tickers_include_analyzed_tickers(session):
+    session.add(AnalysisResult(ticker="MSFT"))
+    session.add(AnalysisResult(ticker="AAPL"))
+    session.commit()
+
+    assert sorted(sentiment_store.tracked_tickers(["aapl", "TSLA"], session=session)) == ["AAPL", "MSFT", "TSLA"]
+
+
+def test_tracked_tickers_age_out_and_are_capped(session):
+    now = datetime.datetime.utcnow()
+    session.add(AnalysisResult(ticker="OLD", last_updated=now - datetime.timedelta(days=30)))
+    session.add(AnalysisResult(ticker="MSFT", last_updated=now - datetime.timedelta(days=2)))
+    session.add(AnalysisResult(ticker="NVDA", last_updated=now - datetime.timedelta(days=1)))
+    session.commit()
+
+    tracked = sentiment_store.tracked_tickers(["AAPL"], session=session, max_tickers=10, active_days=14)
+    capped = sentiment_store.tracked_tickers(["AAPL"], session=session, max_tickers=2, active_days=14)
+
+    assert tracked == ["AAPL", "NVDA", "MSFT"]
+    assert capped == ["AAPL", "NVDA"]
@@ -0,0 +1,40 @@
+import numpy as np
+
+from api.analysis.simulation import (
+    arima_psi_weights,
+    percentile_bands,
+    simulate_bootstrap_paths,
+    simulate_residual_paths,
+)
+
+
+def test_arima_psi_weights():
+    # A random walk keeps every shock: all weights are one.
+    np.testing.assert_allclose(arima_psi_weights([1.0], [1.0], d=1, steps=5), np.ones(5))
+    # An AR(1) with phi = 0.5 has geometrically decaying weights.
+    np.testing.assert_allclose(arima_psi_weights([1.0, -0.5], [1.0], d=0, steps=4), [1, 0.5, 0.25, 0.125])
+
+
+def test_simulate_residual_paths_is_reproducible():
+    forecast = np.linspace(100, 110, 30)
+
+    paths = simulate_residual_paths(forecast, sigma2=4.0, n_paths=2000, seed=7, chunk_size=300)
+
+    assert paths.shape == (2000, 30)
+    assert paths.dtype == np.float32
+    np.testing.assert_array_equal(
+        paths, simulate_residual_paths(forecast, sigma2=4.0, n_paths=2000, seed=7, chunk_size=300)
+    )
+    # Random-walk shocks accumulate: the spread at horizon h is close to 2 * sqrt(h).
+    np.testing.assert_allclose(paths.std(axis=0)[[0, 24]], [2.0, 10.0], rtol=0.1)
+
+
+def test_bootstrap_bands_are_ordered_and_centred():
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, size=500)))
+    forecast = np.full(10, 120.0)
+
+    bands = percentile_bands(simulate_bootstrap_paths(prices, point_forecast=forecast, n_paths=3000))
+
+    assert list(bands) == [5, 25, 50, 75, 95]
+    assert (bands[5] < bands[50]).all() and (bands[50] < bands[95]).all()
+    np.testing.assert_allclose(bands[50], forecast, rtol=0.02)
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from api.config import Config
+from api.data import reddit_data, stock_data
+from api.data.synthetic import (
+    FakeReddit,
+    SyntheticProviderError,
+    SyntheticTicker,
+    generate_price_history,
+    generate_reddit_posts,
+    simulate_request,
+)
+from api.exceptions import StockDataError
+
+
+def test_generate_price_history_is_deterministic():
+    hist = generate_price_history(years=1, seed=3)
+
+    assert list(hist.columns) == ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+    assert len(hist) == 252
+    assert (hist["High"] >= hist["Close"]).all() and (hist["Low"] <= hist["Close"]).all()
+    pd.testing.assert_frame_equal(hist, generate_price_history(years=1, seed=3))
+
+
+def test_generate_reddit_posts():
+    posts = generate_reddit_posts("TEST", n_posts=5, n_comments=3)
+
+    assert len(posts) == 5
+    assert all("TEST" in post.title for post in posts)
+    assert len(posts[0].comments.list()) == 3
+
+
+def test_fake_reddit_drives_get_reddit_sentiment():
+    with patch.object(reddit_data, "get_reddit_client", return_value=FakeReddit(n_posts=10)):
+        score, posts, error = reddit_data.get_reddit_sentiment("TEST")
+
+    assert -1 <= score <= 1
+    assert len(posts) == 10
+    assert error is None
+
+
+@patch.object(Config, "DATA_PROVIDER", "synthetic")
+def test_synthetic_provider_replaces_yahoo_and_reddit():
+    info, hist = stock_data.get_stock_data("TEST")
+
+    assert info["symbol"] == "TEST"
+    assert len(hist) == 5 * 252
+    assert isinstance(stock_data.get_ticker("TEST"), SyntheticTicker)
+    assert isinstance(reddit_data.get_reddit_client(), FakeReddit)
+
+
+@patch.object(Config, "DATA_PROVIDER", "synthetic")
+@patch.object(Config, "SYNTHETIC_ERROR_RATE", 1.0)
+def test_synthetic_provider_errors():
+    with pytest.raises(SyntheticProviderError):
+        simulate_request(SyntheticProviderError("boom"))
+    with pytest.raises(StockDataError):
+        stock_data.get_stock_data("TEST")
@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from api.worker import models_for_queues, parse_preload_config, preload_models
+
+
+def test_parse_preload_config():
+    config = parse_preload_config("celery=finbert,lstm; backtest=lstm")
+    assert config == {"celery": ["finbert", "lstm"], "backtest": ["lstm"]}
+    assert parse_preload_config("") == {}
+
+
+def test_models_for_queues():
+    config = {"celery": ["finbert", "lstm"], "backtest": ["lstm"]}
+    assert models_for_queues(["celery", "backtest"], config) == ["finbert", "lstm"]
+    assert models_for_queues(["backtest"], config) == ["lstm"]
+    assert models_for_queues(["other"], config) == []
+
+
+@patch("api.worker.gc.freeze")
+def test_preload_models(mock_freeze):
+    with patch.dict("api.worker.PRELOADERS", {"finbert": lambda: None}, clear=True):
+        loaded = preload_models(["finbert", "unknown"])
+
+    assert loaded == ["finbert"]
+    mock_freeze.assert_called_once()